@@ -0,0 +1,4 @@
+## loads .env once, before any app module reads its settings from the environment
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,151 @@
+## admin-only maintenance endpoints, enabled by setting ADMIN_TOKEN
+import asyncio
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.db.indexes import ensure_indexes, explain_queries
+from app.db.mongo import get_database
+from app.services import resume_jobs, scheduler
+from app.utils import profiler
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# the per-request profiling middleware is only installed when this is on
+PROFILING_ENABLED = bool(ADMIN_TOKEN) and os.getenv("PROFILING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def valid_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN and token and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()))
+
+
+async def require_admin(x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not valid_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+def profile_response(profile: str, profile_id: str, **headers: str) -> PlainTextResponse:
+    return PlainTextResponse(profile, headers={
+        "X-Profile-Id": profile_id,
+        "Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"',
+        **headers,
+    })
+
+
+class ProfileRequest:
+    """ASGI middleware profiling a single request sent with `X-Profile: 1` and a valid X-Admin-Token.
+
+    The response carries an X-Profile-Id header; once the request has
+    finished, GET /api/v1/admin/profiles/{id} returns its collapsed stacks.
+    Routes that hand work to background workers read request.state.profile_id
+    to have that work profiled as well. Requests without the header pass
+    straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(name == b"x-profile" for name, _ in scope["headers"]):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1" or not valid_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            return await self.app(scope, receive, send)
+
+        sampler = profiler.TaskSampler(asyncio.current_task())
+        try:
+            sampler.start()
+        except profiler.ProfilerBusy:
+            return await self.app(scope, receive, send)
+        profile_id = profiler.new_profile_id()
+        scope.setdefault("state", {})["profile_id"] = profile_id
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.store(sampler.stop(), profile_id)
+
+
+@router.post("/indexes")
+async def apply_indexes(db: AsyncIOMotorDatabase = Depends(get_database)):
+    return {"created": await ensure_indexes(db)}
+
+
+@router.get("/indexes/explain")
+async def explain_indexes(db: AsyncIOMotorDatabase = Depends(get_database)):
+    queries = await explain_queries(db)
+    return {
+        "collscans": [q["name"] for q in queries if q["collscan"]],
+        "queries": queries,
+    }
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_PROFILE_SECONDS, description="How long to sample"),
+    interval_ms: float = Query(5, ge=1, le=1000, description="Time between samples"),
+):
+    """Samples every thread of this worker process and returns collapsed stacks."""
+    try:
+        profile = await profiler.profile_process(seconds, interval_ms / 1000)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profile_response(profile, profiler.store(profile))
+
+
+@router.post("/profile/ingestion/{source}", response_class=PlainTextResponse)
+async def profile_ingestion(source: str, interval_ms: float = Query(5, ge=1, le=1000)):
+    """Runs one ingestion cycle of a source now and returns its collapsed stacks."""
+    if scheduler.scheduler is None:
+        raise HTTPException(status_code=409, detail="Ingestion scheduler is not running")
+    connector = next((c for c in scheduler.scheduler.connectors if c.key == source), None)
+    if connector is None:
+        raise HTTPException(status_code=404, detail=f"Unknown source {source}")
+
+    task = asyncio.create_task(scheduler.scheduler.run_now(connector))
+    sampler = profiler.TaskSampler(task, interval_ms / 1000)
+    try:
+        sampler.start()
+    except profiler.ProfilerBusy as e:
+        task.cancel()
+        raise HTTPException(status_code=409, detail=str(e))
+    headers = {}
+    try:
+        result = await task
+    except Exception as e:
+        # a failing run is often the one worth profiling, so the profile is still returned
+        result = {}
+        headers["X-Ingestion-Error"] = f"{type(e).__name__}: {e}"[:200]
+    finally:
+        profile = sampler.stop()
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"{connector.name} ingestion is already running")
+    return profile_response(profile, profiler.store(profile), **headers)
+
+
+@router.get("/profiles/resume-jobs/{job_id}", response_class=PlainTextResponse)
+async def get_resume_job_profile(job_id: str):
+    """Collapsed stacks of a resume job uploaded with X-Profile, including PDF extraction in the pool process."""
+    profile = await resume_jobs.get_resume_job_profile(job_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Resume job not found, not profiled or not run yet")
+    return profile_response(profile, job_id)
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    profile = profiler.stored(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return profile_response(profile, profile_id)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter
 from .fetch_jobs import router as jobs_router
+from .search_jobs import router as search_jobs_router
+from .job_matches import router as job_matches_router
 from .upload_resume import router as upload_resume_router
 from .users import router as users_router
+from .admin import router as admin_router
 
 router = APIRouter()
 
 router.include_router(jobs_router)
+router.include_router(search_jobs_router)
+router.include_router(job_matches_router)
 router.include_router(upload_resume_router)
 router.include_router(users_router)
+router.include_router(admin_router)
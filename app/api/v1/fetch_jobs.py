@@ -1,24 +1,198 @@
-from fastapi import APIRouter, HTTPException
-from pymongo import MongoClient
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import DESCENDING
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import base64
+import gzip
+import hashlib
+import json
 import os
-from dotenv import load_dotenv
+from app.db.mongo import get_database
+from app.services.catalog_version import catalog_version
+from app.utils.json_response import dumps
+from app.utils.ttl_cache import TTLCache
 
-load_dotenv()
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
 
 router = APIRouter()
 
-client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27018/'))
-db = client['jobs_db']
-collection = db['jobs']
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+JOB_FIELDS = ('id', 'title', 'company', 'url', 'date', 'source')
+# (date, id) is the keyset, so both are always projected
+CURSOR_FIELDS = ('date', 'id')
+SORT_ORDER = [('date', DESCENDING), ('id', DESCENDING)]
+PAGE_CACHE_ENTRIES = int(os.getenv("JOBS_PAGE_CACHE_ENTRIES", "256"))
+# entries are keyed on the catalog version, so the TTL only bounds memory held by idle pages
+PAGE_CACHE_SECONDS = float(os.getenv("JOBS_PAGE_CACHE_SECONDS", "3600"))
+# pages smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
 
-@router.get("/jobs", response_model=List[Dict])
-async def get_all_jobs():
-    """
-    Get all jobs from the database
-    """
+page_cache = TTLCache(PAGE_CACHE_ENTRIES, PAGE_CACHE_SECONDS)
+
+
+def encode_cursor(job: Dict[str, Any]) -> str:
+    """Encodes the (date, id) position of a job as an opaque cursor."""
+    raw = json.dumps([job['date'], job['id']], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decodes a cursor produced by encode_cursor back into (date, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, job_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(date, str) or not isinstance(job_id, str):
+            raise ValueError("cursor values must be strings")
+        return date, job_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_query(cursor: Optional[str]) -> Dict[str, Any]:
+    """Returns the filter selecting jobs strictly after the cursor in (date, id) desc order."""
+    if not cursor:
+        return {}
+    date, job_id = decode_cursor(cursor)
+    return {'$or': [
+        {'date': {'$lt': date}},
+        {'date': date, 'id': {'$lt': job_id}},
+    ]}
+
+
+def build_projection(fields: Optional[str]) -> Dict[str, int]:
+    """Parses the comma-separated `fields` parameter into a Mongo projection."""
+    if not fields:
+        requested = JOB_FIELDS
+    else:
+        requested = tuple(f.strip() for f in fields.split(',') if f.strip())
+        unknown = [f for f in requested if f not in JOB_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(JOB_FIELDS)}"
+            )
+    projection = {'_id': 0}
+    for field in (*CURSOR_FIELDS, *requested):
+        projection[field] = 1
+    return projection
+
+
+async def stream_ndjson(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    projection: Dict[str, int],
+    limit: Optional[int],
+) -> AsyncIterator[bytes]:
+    """Yields one JSON document per line as the Mongo cursor produces them."""
+    cursor = collection.find(query, projection).sort(SORT_ORDER).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        async for job in cursor:
+            yield dumps(job) + b'\n'
+    finally:
+        await cursor.close()
+
+
+class CachedPage:
+    """A serialized page with its ETag and pre-compressed encodings."""
+
+    def __init__(self, body: bytes):
+        self.etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.bodies = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.bodies['gzip'] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.bodies['br'] = brotli.compress(body, quality=5)
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Picks br, then gzip, then identity from what the client accepts and the page has."""
+    accepted = set()
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip())
+    for coding in ('br', 'gzip'):
+        if coding in available and (coding in accepted or '*' in accepted):
+            return coding
+    return 'identity'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # weak comparison, as required for If-None-Match
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+async def load_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    projection: Dict[str, int],
+    page_size: int,
+) -> bytes:
     try:
-        jobs = list(collection.find({}, {'_id': 0}).sort('date', -1))
-        return jobs
+        # Fetch one extra document to know whether another page exists
+        jobs: List[Dict[str, Any]] = await (
+            collection.find(query, projection).sort(SORT_ORDER).limit(page_size + 1).to_list(length=None)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching jobs: {str(e)}")
+
+    next_cursor = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        next_cursor = encode_cursor(jobs[-1])
+    return dumps({"jobs": jobs, "next_cursor": next_cursor})
+
+
+@router.get("/jobs")
+async def get_all_jobs(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; in stream mode, caps the number of jobs streamed"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return"),
+    stream: bool = Query(False, description="Stream jobs as NDJSON instead of returning a page"),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """
+    Get jobs from the database, newest first, one page at a time
+    """
+    collection = db['jobs']
+    query = build_query(cursor)
+    projection = build_projection(fields)
+
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(collection, query, projection, limit),
+            media_type="application/x-ndjson"
+        )
+
+    page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    # pages only change when ingestion bumps the catalog version, so they are served from memory until then
+    version = await catalog_version.current(db)
+    key = (version, cursor, page_size, fields)
+    page = page_cache.get(key)
+    if page is None:
+        page = CachedPage(await load_page(collection, query, projection, page_size))
+        page_cache.set(key, page)
+
+    headers = {'ETag': page.etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    if etag_matches(request.headers.get('if-none-match'), page.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(request.headers.get('accept-encoding', ''), page.bodies)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(content=page.bodies[encoding], media_type="application/json", headers=headers)
@@ -1,31 +1,46 @@
-from fastapi import APIRouter, HTTPException
-from pymongo import MongoClient
-import os
-from dotenv import load_dotenv
+from fastapi import APIRouter
 from datetime import datetime
-
-load_dotenv()
+from app.services import health_prober
+from app.services.catalog_sync import catalog_sync
+from app.services.llm_cache import extraction_cache
+from app.utils.json_response import JSONResponse
 
 router = APIRouter()
 
-client = MongoClient(os.getenv('MONGODB_URI'))
+# every check below reads state cached by app.services.health_prober; none touches a dependency
+
+@router.get("/live", tags=["health"])
+async def liveness():
+    """The process is up and its event loop is serving requests."""
+    return {"status": "alive"}
 
-def check_mongodb_connection():
-    try:
-        client.server_info()
-        return True
-    except Exception as e:
-        return False
+@router.get("/ready", tags=["health"])
+async def readiness():
+    """200 when every required dependency passed its last probe and the job catalog is loaded, 503 otherwise."""
+    prober = health_prober.prober
+    if prober is None:
+        return JSONResponse(status_code=503, content={"status": "starting", "ready": False})
+    report = prober.report()
+    # search and matching serve empty results until the first catalog load
+    report["catalog_loaded"] = catalog_sync.loaded
+    if not catalog_sync.loaded:
+        report.update(status="starting", ready=False)
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
 
 @router.get("/health", tags=["health"])
 async def health_check():
-    db_status = check_mongodb_connection()
+    prober = health_prober.prober
+    db_up = prober is not None and prober.probes["mongodb"].status() == health_prober.UP
     return {
         "server_status": "healthy",
-        "database_status": "healthy" if db_status else "unhealthy",
+        "database_status": "healthy" if db_up else "unhealthy",
         "timestamp": datetime.utcnow().isoformat()
     }
 
 @router.get("/health/server", tags=["health"])
 async def check_server():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+@router.get("/health/llm-cache", tags=["health"])
+async def llm_cache_stats():
+    return {"llm_cache": extraction_cache.stats(), "timestamp": datetime.utcnow().isoformat()}
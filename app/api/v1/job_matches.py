@@ -0,0 +1,31 @@
+## ranks the jobs catalog against a user's parsed resume, computed locally from the in-process matcher
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DESCENDING
+from app.db.mongo import get_database
+from app.services.job_matcher import SECTION_WEIGHTS, job_matcher
+from app.utils.json_response import JSONResponse
+
+router = APIRouter()
+
+MAX_MATCHES = 100
+RESUME_PROJECTION = {'_id': 0, **{section: 1 for section in SECTION_WEIGHTS}}
+
+
+@router.get("/jobs/matches")
+async def get_job_matches(
+    user_email: str = Query(..., description="Email the resume was uploaded with"),
+    k: int = Query(20, ge=1, le=MAX_MATCHES, description="Number of jobs to return"),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """
+    Get the jobs that best match the user's latest resume
+    """
+    resume = await db['resumes'].find_one(
+        {'user_email': user_email},
+        RESUME_PROJECTION,
+        sort=[('created_at', DESCENDING)]
+    )
+    if resume is None:
+        raise HTTPException(status_code=404, detail="No resume found for this user")
+    return JSONResponse({"user_email": user_email, "jobs": job_matcher.match(resume, k=k)})
@@ -5,9 +5,6 @@ from typing import List, Optional
 from pydantic import BaseModel
 from app.services.job_scraper.linkedin_scraper import LinkedInJobScraper
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 router = APIRouter()
 
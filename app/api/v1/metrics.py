@@ -0,0 +1,86 @@
+## prometheus scrape endpoint and the middleware timing every http request
+import os
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.metrics import REGISTRY, Counter, Gauge, Histogram
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# requests that match no route share one label value, so scanners cannot blow up the series count
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status",
+    labels=["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served")
+HTTP_EXCEPTIONS = Counter("http_exceptions", "Requests that raised an unhandled exception", labels=["method", "route"])
+
+router = APIRouter(tags=["metrics"])
+
+
+class RequestMetrics:
+    """ASGI middleware recording latency per method, route template and status code.
+
+    The route label is the full matched path template ("/api/v1/resume/jobs/{job_id}"),
+    read from the scope after routing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.in_progress = HTTP_REQUESTS_IN_PROGRESS.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        self.in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            HTTP_EXCEPTIONS.labels(scope["method"], route_label(scope)).inc()
+            raise
+        finally:
+            self.in_progress.dec()
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_label(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+def route_label(scope) -> str:
+    """Mount and router prefixes plus the matched route's template.
+
+    Depending on the FastAPI version, the route in the scope carries either the
+    full template or only the part below its router's prefix, so the prefix is
+    recovered from the request path: it is whatever precedes the part the
+    route's own pattern matches.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    # older servers leave the mount prefix out of path
+    if root_path and not path.startswith(root_path):
+        path = root_path + path
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,32 @@
+## keyword search over the jobs catalog, served from the in-process search index
+from datetime import date
+from fastapi import APIRouter, Query
+from typing import Optional
+from app.services.search_index import search_index
+from app.utils.json_response import JSONResponse
+
+router = APIRouter()
+
+MAX_RESULTS = 100
+
+
+@router.get("/jobs/search")
+async def search_jobs(
+    q: str = Query(..., min_length=1, description="Keywords matched against job title and company"),
+    source: Optional[str] = Query(None, description="Only jobs from this source, e.g. 'Remote OK'"),
+    company: Optional[str] = Query(None, description="Only jobs from this company (case-insensitive)"),
+    date_from: Optional[date] = Query(None, description="Earliest posting date, YYYY-MM-DD"),
+    date_to: Optional[date] = Query(None, description="Latest posting date, YYYY-MM-DD"),
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+):
+    """
+    Search jobs by keyword, ranked by BM25 relevance
+    """
+    return JSONResponse(search_index.search(
+        q,
+        limit=limit,
+        source=source,
+        company=company,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+    ))
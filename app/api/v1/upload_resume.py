@@ -1,62 +1,131 @@
 ## api to upload and parse users resume via gemini llm
 
 import os
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
-from app.services.resume_parser import ResumeParser
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from app.db import mongo
 from app.db.models import ResumeResponse
-import tempfile
-import shutil
+from app.services.pdf_text import count_pdf_pages
+from app.services.resume_jobs import DONE, enqueue_resume_job, get_resume_job
+from app.utils.json_response import JSONResponse
 from bson import ObjectId
-from datetime import datetime
-import json
 from typing import Dict, Any
 
 router = APIRouter(prefix="/resume", tags=["Resume Parsing"])
-parser = ResumeParser()
-
-def json_serial(obj):
-    """JSON serializer for objects not serializable by default json code"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-@router.post("/upload")
-async def upload_resume(file: UploadFile = File(...), user_email: str = Form(...)) -> Dict[str, Any]:
+
+# queued uploads are stored in a mongodb document, so this stays well below its 16MB limit
+MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("RESUME_MAX_PDF_PAGES", "10"))
+READ_CHUNK_BYTES = 64 * 1024
+# room for the multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+
+class UploadSizeLimit:
+    """ASGI middleware that stops oversized upload bodies before they are parsed or spooled.
+
+    Requests declaring a larger Content-Length get 413 straight away; bodies
+    without one are counted as they arrive and cut off past the limit.
+    """
+
+    def __init__(self, app, path: str, max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                response = JSONResponse(status_code=413, content={"detail": "Resume upload is too large."})
+                return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > self.max_bytes:
+                raise HTTPException(status_code=413, detail="Resume upload is too large.")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+async def read_upload(file: UploadFile, limit: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Reads an upload in chunks, rejecting it with 413 as soon as it exceeds limit."""
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail=f"Resume must be at most {limit} bytes.")
+    buffer = bytearray()
+    while chunk := await file.read(READ_CHUNK_BYTES):
+        buffer += chunk
+        if len(buffer) > limit:
+            raise HTTPException(status_code=413, detail=f"Resume must be at most {limit} bytes.")
+    return bytes(buffer)
+
+async def validate_pdf(pdf: bytes):
+    """Checks the PDF signature and page count before any parsing work is queued."""
+    if not pdf.startswith(PDF_MAGIC):
+        raise HTTPException(status_code=400, detail="File is not a valid PDF.")
+    try:
+        pages = await run_in_threadpool(count_pdf_pages, pdf)
+    except Exception:
+        raise HTTPException(status_code=400, detail="File is not a valid PDF.")
+    if pages == 0:
+        raise HTTPException(status_code=400, detail="PDF has no pages.")
+    if pages > MAX_PDF_PAGES:
+        raise HTTPException(status_code=413, detail=f"Resume must have at most {MAX_PDF_PAGES} pages.")
+
+@router.post("/upload", status_code=202)
+async def upload_resume(request: Request, file: UploadFile = File(...), user_email: str = Form(...)) -> Dict[str, Any]:
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
-    
+
+    pdf = await read_upload(file)
+    await validate_pdf(pdf)
+
+    # set by the admin profiling middleware for uploads sent with X-Profile
+    profiled = getattr(request.state, "profile_id", None) is not None
     try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-
-        resume_id, task_id = await parser.process_resume(tmp_path, user_email=user_email)
-        
-        try:
-            os.unlink(tmp_path)
-            print(f"Temporary file cleaned up: {tmp_path}")
-        except Exception as cleanup_err:
-            print(f"Warning: Failed to clean up temporary file: {cleanup_err}")
-
-        resume_data = await parser.resumes_collection.find_one({"_id": ObjectId(resume_id)})
-        if not resume_data:
-            raise HTTPException(status_code=500, detail="Failed to retrieve saved resume data")
-            
-        resume_data["_id"] = str(resume_data["_id"])
-        resume_data["created_at"] = resume_data["created_at"].isoformat()
-        resume_data["updated_at"] = resume_data["updated_at"].isoformat()
-        
-        response_data = {
-            "resume": resume_data,
-            "task_id": task_id,
-            "message": "Resume uploaded and processing started"
-        }
-        
-        return JSONResponse(content=response_data)
-        
+        job_id = await enqueue_resume_job(pdf, file.filename, user_email, profile=profiled)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing resume: {str(e)}")
+
+    content = {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": str(request.url_for("get_resume_job_status", job_id=job_id)),
+        "message": "Resume uploaded and queued for processing"
+    }
+    if profiled:
+        content["profile_url"] = str(request.url_for("get_resume_job_profile", job_id=job_id))
+    return JSONResponse(status_code=202, content=content)
+
+@router.get("/jobs/{job_id}")
+async def get_resume_job_status(job_id: str) -> Dict[str, Any]:
+    job = await get_resume_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Resume job not found")
+
+    response_data = {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "stage": job.get("stage"),
+        "progress": job.get("progress", 0),
+        "attempts": job.get("attempts", 0),
+        "error": job.get("error"),
+        "task_id": None,
+        "changed_sections": job.get("changed_sections"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+    if job["status"] == DONE and job.get("resume_id"):
+        resume_data = await mongo.get_database().resumes.find_one({"_id": ObjectId(job["resume_id"])})
+        if resume_data:
+            response_data["task_id"] = resume_data.get("embedding_task_id")
+        response_data["resume"] = resume_data
+
+    return JSONResponse(content=response_data)
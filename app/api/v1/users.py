@@ -1,21 +1,19 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from pymongo import MongoClient
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import os
+from app.db.mongo import get_database
+from app.services.auth import ALGORITHM, SECRET_KEY, decode_token, get_user, invalidate_user
+from app.services.password_hasher import HashPoolFull, password_hasher
 
-SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
-db = client[os.getenv("MONGODB_DB", "jobs_db")]
-users_collection = db["users"]
+bearer_scheme = HTTPBearer(auto_error=False)
 
 router = APIRouter()
 
@@ -33,11 +31,12 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def too_busy(error: HashPoolFull) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, please retry",
+        headers={"Retry-After": str(error.retry_after)},
+    )
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -46,39 +45,67 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 @router.post("/signup", response_model=Token)
-def signup(user: UserSignup):
-    if users_collection.find_one({"email": user.email}):
+async def signup(user: UserSignup, db: AsyncIOMotorDatabase = Depends(get_database)):
+    users_collection = db["users"]
+    if await users_collection.find_one({"email": user.email}, {"_id": 1}):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HashPoolFull as e:
+        raise too_busy(e)
     user_dict = user.dict()
     user_dict["password"] = hashed_password
-    users_collection.insert_one(user_dict)
+    try:
+        await users_collection.insert_one(user_dict)
+    except DuplicateKeyError:
+        # a concurrent signup for the same email won the unique index
+        raise HTTPException(status_code=400, detail="Email already registered")
+    invalidate_user(user.email)
     access_token = create_access_token({"sub": user.email, "name": user.name})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token)
-def login(user: UserLogin):
-    db_user = users_collection.find_one({"email": user.email})
-    if not db_user or not verify_password(user.password, db_user["password"]):
+async def login(user: UserLogin, db: AsyncIOMotorDatabase = Depends(get_database)):
+    db_user = await db["users"].find_one({"email": user.email})
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(user.password, db_user["password"])
+    except HashPoolFull as e:
+        raise too_busy(e)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # stored hash predates the current cost factor
+        await db["users"].update_one({"_id": db_user["_id"], "password": db_user["password"]}, {"$set": {"password": new_hash}})
+        invalidate_user(db_user["email"])
     access_token = create_access_token({"sub": db_user["email"], "name": db_user.get("name", "")})
     return {"access_token": access_token, "token_type": "bearer"}
 
-# Optional: Dependency for protected routes
-def get_current_user(token: str = Depends(lambda: None)):
+# Dependency for protected routes
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if credentials is None:
+        raise credentials_exception
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        user = users_collection.find_one({"email": email})
-        if user is None:
-            raise credentials_exception
-        return user
+        payload = decode_token(credentials.credentials)
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+    email: str = payload.get("sub")
+    if email is None:
+        raise credentials_exception
+    user = await get_user(db, email)
+    if user is None:
+        raise credentials_exception
+    return user
+
+@router.get("/me")
+async def read_current_user(user: dict = Depends(get_current_user)):
+    return {"email": user["email"], "name": user.get("name", "")}
@@ -0,0 +1,151 @@
+## index manifest for every collection, applied at startup, plus explain() checks of the hot query shapes
+##
+##   python -m app.db.indexes [--apply] [--explain]
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+ENSURE_INDEXES = os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() in ("1", "true", "yes")
+
+# _id lookups (seen_jobs, feed_state, ingestion_locks, llm_cache, embedder_outbox) need no extra index
+INDEXES: Dict[str, List[IndexModel]] = {
+    "jobs": [
+        # ingestion upserts and hash lookups by id; ids are generate_id(url)
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # keyset pagination in GET /jobs
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+        # incremental catalog sync
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "resumes": [
+        # not unique: users may still have several resumes saved before versioning
+        IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)], name="user_email_created_at"),
+    ],
+    "resume_jobs": [
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease_until"),
+    ],
+    "embedder_outbox": [
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease_until"),
+        IndexModel([("claim", ASCENDING)], name="claim", sparse=True),
+    ],
+    "llm_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("last_used_at", ASCENDING)], name="last_used_at"),
+    ],
+}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """Creates every index in the manifest; existing identical indexes are left alone.
+
+    A collection whose indexes cannot be built (for example duplicate values
+    under a unique index) is reported and skipped rather than failing startup.
+    """
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            print(f"Failed to create indexes on {collection}: {e}")
+            created[collection] = []
+    return created
+
+
+def query_shapes() -> List[dict]:
+    """Representative filters and sorts of the queries the service runs most often."""
+    now = datetime.utcnow()
+    return [
+        {"name": "jobs_page", "collection": "jobs", "filter": {}, "sort": {"date": -1, "id": -1}, "limit": 51},
+        {"name": "jobs_page_after_cursor", "collection": "jobs",
+         "filter": {"$or": [{"date": {"$lt": "2024-01-01"}}, {"date": "2024-01-01", "id": {"$lt": "f" * 32}}]},
+         "sort": {"date": -1, "id": -1}, "limit": 51},
+        {"name": "jobs_by_id", "collection": "jobs", "filter": {"id": {"$in": ["0" * 32]}}},
+        {"name": "jobs_changed_since", "collection": "jobs", "filter": {"updated_at": {"$gt": now}}},
+        {"name": "user_by_email", "collection": "users", "filter": {"email": "user@example.com"}, "limit": 1},
+        {"name": "latest_resume", "collection": "resumes", "filter": {"user_email": "user@example.com"},
+         "sort": {"created_at": -1}, "limit": 1},
+        {"name": "resume_job_claim", "collection": "resume_jobs",
+         "filter": {"$or": [{"status": "queued", "available_at": {"$lte": now}},
+                            {"status": "running", "lease_until": {"$lt": now}}]}, "limit": 1},
+        {"name": "embedder_outbox_due", "collection": "embedder_outbox",
+         "filter": {"$or": [{"status": "pending", "available_at": {"$lte": now}},
+                            {"status": "sending", "lease_until": {"$lt": now}}]},
+         "sort": {"available_at": 1}, "limit": 20},
+        {"name": "embedder_outbox_claimed", "collection": "embedder_outbox", "filter": {"claim": "0" * 32}},
+        {"name": "llm_cache_lru", "collection": "llm_cache", "filter": {}, "sort": {"last_used_at": 1}, "limit": 100},
+    ]
+
+
+def plan_stages(plan: dict) -> List[str]:
+    """Stage names of a query plan tree, outermost first."""
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+async def explain_queries(db: AsyncIOMotorDatabase) -> List[dict]:
+    """Runs explain on every query shape and flags the ones answered by a collection scan."""
+    reports = []
+    for shape in query_shapes():
+        command = {"find": shape["collection"], "filter": shape["filter"]}
+        if shape.get("sort"):
+            command["sort"] = shape["sort"]
+        if shape.get("limit"):
+            command["limit"] = shape["limit"]
+        explained = await db.command("explain", command, verbosity="queryPlanner")
+        winning_plan = explained["queryPlanner"]["winningPlan"]
+        stages = plan_stages(winning_plan)
+        reports.append({
+            "name": shape["name"],
+            "collection": shape["collection"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+    return reports
+
+
+async def run(apply: bool, explain: bool) -> int:
+    from app.db import mongo
+    mongo.connect()
+    try:
+        db = mongo.get_database()
+        output = {}
+        if apply:
+            output["created"] = await ensure_indexes(db)
+        if explain:
+            output["queries"] = await explain_queries(db)
+        print(json.dumps(output, indent=2))
+        return 1 if any(q["collscan"] for q in output.get("queries", [])) else 0
+    finally:
+        mongo.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Apply the index manifest and check query plans")
+    arg_parser.add_argument("--apply", action="store_true", help="create missing indexes")
+    arg_parser.add_argument("--explain", action="store_true", help="explain hot queries; exit 1 on any COLLSCAN")
+    args = arg_parser.parse_args()
+    if not (args.apply or args.explain):
+        args.apply = args.explain = True
+    sys.exit(asyncio.run(run(args.apply, args.explain)))
+
+
+if __name__ == "__main__":
+    main()
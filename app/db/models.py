@@ -31,6 +31,8 @@ class Resume(BaseModel):
     certifications: List[Dict[str, Any]]
     preferences: Dict[str, Any]
     markdown: str
+    version: int = 1
+    section_hashes: Dict[str, str] = {}
     created_at: datetime
     updated_at: datetime
 
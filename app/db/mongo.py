@@ -0,0 +1,128 @@
+## process-wide async mongodb client, created once in the app lifespan and shared by routes and services
+import os
+import threading
+from collections import defaultdict
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from app.utils.metrics import CallbackMetric
+
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DB = os.getenv("MONGODB_DB", "jobs_db")
+
+_client: Optional[AsyncIOMotorClient] = None
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counts of the shared client, summed over servers.
+
+    pymongo calls these hooks from its own threads, so updates take a lock;
+    the metrics endpoint reads the totals at scrape time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = defaultdict(int)
+
+    def connection_created(self, event):
+        with self.lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.open -= 1
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_failures[str(event.reason)] += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_stats = PoolStats()
+
+CallbackMetric(
+    "mongodb_pool_connections", "Connections in the MongoDB pool by state",
+    lambda: {("open",): pool_stats.open, ("in_use",): pool_stats.in_use}, labels=["state"]
+)
+CallbackMetric(
+    "mongodb_pool_max_size", "Configured maxPoolSize per server",
+    lambda: {(): client_options()["maxPoolSize"]}
+)
+CallbackMetric(
+    "mongodb_pool_checkouts", "Connections checked out of the pool",
+    lambda: {(): pool_stats.checkouts}, kind="counter"
+)
+CallbackMetric(
+    "mongodb_pool_checkout_failures", "Failed pool checkouts by reason",
+    lambda: {(reason,): count for reason, count in list(pool_stats.checkout_failures.items())},
+    labels=["reason"], kind="counter"
+)
+
+
+def client_options() -> dict:
+    """Pool sizing and timeouts for the shared client, overridable from the environment."""
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "30000")),
+    }
+
+
+def connect() -> AsyncIOMotorClient:
+    """Creates the shared client if it does not exist yet and returns it."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(MONGODB_URI, event_listeners=[pool_stats], **client_options())
+    return _client
+
+
+def close() -> None:
+    """Closes the shared client; the next connect() creates a fresh one."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("MongoDB client is not initialised; call app.db.mongo.connect() first")
+    return _client
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    """FastAPI dependency returning the application database on the shared client."""
+    return get_client()[MONGODB_DB]
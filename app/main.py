@@ -1,12 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import api, health
+from app.api.v1 import admin, api, health, metrics
+from app.api.v1.upload_resume import UploadSizeLimit
+from app.db import indexes, mongo
+from app.services import embedder_dispatcher, health_prober, resume_jobs, scheduler
+from app.services.catalog_sync import catalog_sync
+from app.services.job_matcher import job_matcher
+from app.services.password_hasher import password_hasher
+from app.utils.json_response import JSONResponse
+from app.services.search_index import search_index
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.connect()
+    health_prober.start_prober()
+    if indexes.ENSURE_INDEXES:
+        try:
+            await indexes.ensure_indexes(mongo.get_database())
+        except Exception as e:
+            print(f"Index provisioning failed: {e}")
+    catalog_sync.register(search_index.add_many)
+    catalog_sync.register(job_matcher.add_many)
+    # search and matching read the in-process indexes, so they are loaded before serving
+    try:
+        await catalog_sync.refresh()
+    except Exception as e:
+        print(f"Initial catalog load failed, retrying in the background: {e}")
+    catalog_sync.start()
+    scheduler.start_scheduler()
+    embedder_dispatcher.start_dispatcher()
+    resume_jobs.start_worker_pool()
+    try:
+        yield
+    finally:
+        await resume_jobs.stop_worker_pool()
+        await embedder_dispatcher.stop_dispatcher()
+        await scheduler.stop_scheduler()
+        await catalog_sync.stop()
+        await health_prober.stop_prober()
+        password_hasher.shutdown()
+        mongo.close()
+
+
 app = FastAPI(
     title="Job Assistant API",
     description="API for job search and resume processing",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=JSONResponse
 )
 
 app.add_middleware(
@@ -16,9 +60,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadSizeLimit, path="/api/v1/resume/upload")
+if admin.PROFILING_ENABLED:
+    app.add_middleware(admin.ProfileRequest)
+if metrics.METRICS_ENABLED:
+    # added last so it is outermost and also times requests the inner middleware rejects
+    app.add_middleware(metrics.RequestMetrics)
 
 app.include_router(api.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api/v1/health")
+if metrics.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,66 @@
+## jwt verification and user lookup for authenticated routes, cached in-process
+import hashlib
+import os
+import time
+from typing import Optional
+from jose import jwt, JWTError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.utils.ttl_cache import TTLCache
+
+SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
+ALGORITHM = "HS256"
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_SECONDS", "300"))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+# short, so changes made by other workers show up quickly even without invalidation
+USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "30"))
+USER_PROJECTION = {"password": 0}
+
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_SECONDS)
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_SECONDS)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def decode_token(token: str) -> dict:
+    """Verified claims of a token; raises JWTError when it is invalid or expired.
+
+    Claims are cached by the token's digest until the cache TTL or the
+    token's own expiry, whichever comes first.
+    """
+    key = token_digest(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        if claims.get("exp", float("inf")) > time.time():
+            return claims
+        token_cache.pop(key)
+        raise JWTError("Signature has expired.")
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = TOKEN_CACHE_SECONDS
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, claims, ttl=ttl)
+    return claims
+
+
+async def get_user(db: AsyncIOMotorDatabase, email: str) -> Optional[dict]:
+    """User record without the password hash, from the cache or MongoDB.
+
+    Callers get their own copy, so changing it never touches the cached entry.
+    """
+    user = user_cache.get(email)
+    if user is None:
+        user = await db["users"].find_one({"email": email}, USER_PROJECTION)
+        if user is None:
+            return None
+        user_cache.set(email, user)
+    return dict(user)
+
+
+def invalidate_user(email: str):
+    """Drops a cached user record; call after any write to that user."""
+    user_cache.pop(email)
@@ -0,0 +1,95 @@
+## keeps in-process views of the jobs catalog (search index, ...) in step with mongodb
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.db import mongo
+
+SYNC_INTERVAL_SECONDS = float(os.getenv("CATALOG_SYNC_INTERVAL_SECONDS", "60"))
+SYNC_BATCH_SIZE = 1000
+# re-read a small window before the watermark so writes from workers with skewed clocks are not missed
+WATERMARK_OVERLAP = timedelta(seconds=30)
+PROJECTION = {'_id': 0, 'id': 1, 'title': 1, 'company': 1, 'url': 1, 'date': 1, 'source': 1, 'updated_at': 1}
+
+Consumer = Callable[[List[dict]], None]
+
+
+class CatalogSync:
+    """Streams new and changed jobs to registered consumers.
+
+    The first refresh loads the whole catalog; later ones only read jobs whose
+    updated_at is past the watermark, so every consumer is maintained
+    incrementally instead of being rebuilt. Consumers must treat a job they
+    already hold as an update.
+    """
+
+    def __init__(self):
+        self.consumers: List[Consumer] = []
+        self.watermark: Optional[datetime] = None
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def register(self, consumer: Consumer):
+        if consumer not in self.consumers:
+            self.consumers.append(consumer)
+
+    def publish(self, jobs: List[dict]):
+        for consumer in self.consumers:
+            consumer(jobs)
+
+    async def refresh(self, db: Optional[AsyncIOMotorDatabase] = None) -> int:
+        """Pushes jobs changed since the last refresh to every consumer; returns how many were read."""
+        db = db if db is not None else mongo.get_database()
+        async with self.lock:
+            query = {}
+            if self.watermark is not None:
+                query = {'updated_at': {'$gt': self.watermark - WATERMARK_OVERLAP}}
+            watermark = self.watermark
+            count = 0
+            batch = []
+            async for job in db["jobs"].find(query, PROJECTION).batch_size(SYNC_BATCH_SIZE):
+                updated_at = job.pop('updated_at', None)
+                if updated_at is not None and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+                batch.append(job)
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    self.publish(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.publish(batch)
+                count += len(batch)
+            self.watermark = watermark or datetime.utcnow()
+            return count
+
+    @property
+    def loaded(self) -> bool:
+        """True once the whole catalog has been pushed to the consumers."""
+        return self.watermark is not None
+
+    async def run(self, interval: float = SYNC_INTERVAL_SECONDS):
+        # the app lifespan normally did the first, full refresh before serving
+        if self.loaded:
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Catalog sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run(), name="catalog-sync")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+
+catalog_sync = CatalogSync()
@@ -0,0 +1,49 @@
+## monotonically increasing version of the jobs catalog, bumped by ingestion whenever jobs change
+import os
+import time
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from app.db import mongo
+
+# how long a worker trusts its copy of the version before re-reading it
+VERSION_TTL_SECONDS = float(os.getenv("CATALOG_VERSION_TTL_SECONDS", "5"))
+VERSION_ID = "jobs"
+
+
+class CatalogVersion:
+    """Reads and bumps the version counter stored in the catalog_meta collection.
+
+    Readers reuse the last value for VERSION_TTL_SECONDS, so serving cached
+    pages costs one tiny _id lookup every few seconds at most; a bump made
+    by this process is visible to it immediately.
+    """
+
+    def __init__(self, ttl: float = VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self.value: Optional[int] = None
+        self.checked_at = 0.0
+
+    def collection(self, db: Optional[AsyncIOMotorDatabase]):
+        return (db if db is not None else mongo.get_database())["catalog_meta"]
+
+    async def current(self, db: Optional[AsyncIOMotorDatabase] = None) -> int:
+        if self.value is None or time.monotonic() - self.checked_at > self.ttl:
+            doc = await self.collection(db).find_one({"_id": VERSION_ID}, {"version": 1})
+            self.value = doc["version"] if doc else 0
+            self.checked_at = time.monotonic()
+        return self.value
+
+    async def bump(self, db: Optional[AsyncIOMotorDatabase] = None) -> int:
+        doc = await self.collection(db).find_one_and_update(
+            {"_id": VERSION_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.value = doc["version"]
+        self.checked_at = time.monotonic()
+        return self.value
+
+
+catalog_version = CatalogVersion()
@@ -0,0 +1,239 @@
+## outbox for embedding requests to the worker: persisted first, coalesced per user, sent in batches
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+import httpx
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.db import mongo
+from app.utils.metrics import Counter, Histogram
+
+WORKER_URL = os.getenv("WORKER_URL")
+# requests for the same user inside this window are sent once
+COALESCE_WINDOW_SECONDS = float(os.getenv("EMBEDDER_COALESCE_SECONDS", "5"))
+BATCH_SIZE = int(os.getenv("EMBEDDER_BATCH_SIZE", "20"))
+CONCURRENCY = int(os.getenv("EMBEDDER_CONCURRENCY", "5"))
+TIMEOUT_SECONDS = float(os.getenv("EMBEDDER_TIMEOUT_SECONDS", "10"))
+MAX_ATTEMPTS = int(os.getenv("EMBEDDER_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = float(os.getenv("EMBEDDER_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("EMBEDDER_BACKOFF_MAX_SECONDS", "600"))
+POLL_INTERVAL_SECONDS = float(os.getenv("EMBEDDER_POLL_SECONDS", "2"))
+# a claimed batch whose dispatcher died is released after this long
+LEASE_SECONDS = TIMEOUT_SECONDS * 3
+
+PENDING = "pending"
+SENDING = "sending"
+FAILED = "failed"
+
+WORKER_REQUEST_SECONDS = Histogram("embedder_request_duration_seconds", "Latency of embedding requests to the worker")
+REQUESTS = Counter("embedder_requests", "Embedding requests by result", labels=["result"])
+
+
+class EmbedderError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def outbox_collection(db: Optional[AsyncIOMotorDatabase] = None):
+    return (db if db is not None else mongo.get_database())["embedder_outbox"]
+
+
+async def enqueue_embedding(
+    user_email: str,
+    resume_id: str,
+    sections: List[str],
+    db: Optional[AsyncIOMotorDatabase] = None,
+):
+    """Records that the embeddings of some of a user's resume sections need recomputing.
+
+    The outbox holds one document per user: a request while one is already
+    waiting points it at the newer resume and adds its sections, and the
+    send time of the first request is kept so a burst of uploads costs one
+    worker call.
+    """
+    now = datetime.utcnow()
+    collection = outbox_collection(db)
+    # a request that had given up is revived by the new resume
+    await collection.update_one(
+        {"_id": user_email, "status": FAILED},
+        {"$set": {"status": PENDING, "attempts": 0, "available_at": now + timedelta(seconds=COALESCE_WINDOW_SECONDS)}}
+    )
+    await collection.update_one(
+        {"_id": user_email},
+        {
+            "$set": {"resume_id": resume_id, "requested_at": now},
+            "$addToSet": {"sections": {"$each": sections}},
+            "$inc": {"version": 1},
+            "$setOnInsert": {
+                "status": PENDING,
+                "attempts": 0,
+                "available_at": now + timedelta(seconds=COALESCE_WINDOW_SECONDS),
+                "created_at": now,
+            },
+        },
+        upsert=True
+    )
+    if dispatcher is not None:
+        dispatcher.wake()
+
+
+class EmbedderDispatcher:
+    """Drains the embedder outbox with a pooled HTTP client.
+
+    Each cycle claims up to BATCH_SIZE due requests and sends them with at
+    most CONCURRENCY in flight. Successful sends record the worker's task_id
+    on the resume; failures are retried with exponential backoff.
+    """
+
+    def __init__(self, worker_url: Optional[str] = WORKER_URL, client: Optional[httpx.AsyncClient] = None):
+        self.worker_url = worker_url
+        self.client = client
+        self.owns_client = client is None
+        self.semaphore = asyncio.Semaphore(CONCURRENCY)
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+            )
+        self.task = asyncio.create_task(self.run(), name="embedder-dispatcher")
+
+    async def stop(self):
+        self.stopping = True
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.client is not None and self.owns_client:
+            await self.client.aclose()
+            self.client = None
+
+    def wake(self):
+        self.wakeup.set()
+
+    async def run(self):
+        # stop() also sets the flag: wait_for can swallow a cancel that races the wakeup (python 3.11)
+        while not self.stopping:
+            self.wakeup.clear()
+            try:
+                sent = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Embedder dispatch failed: {e}")
+                sent = 0
+            if sent:
+                continue
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def claim(self) -> List[dict]:
+        """Marks up to BATCH_SIZE due requests as sending for this dispatcher and returns them."""
+        collection = outbox_collection()
+        now = datetime.utcnow()
+        due = {"$or": [
+            {"status": PENDING, "available_at": {"$lte": now}},
+            {"status": SENDING, "lease_until": {"$lt": now}},
+        ]}
+        ids = [doc["_id"] async for doc in collection.find(due, {"_id": 1}).sort("available_at", 1).limit(BATCH_SIZE)]
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        await collection.update_many(
+            {"$and": [{"_id": {"$in": ids}}, due]},
+            {"$set": {"status": SENDING, "claim": token, "lease_until": now + timedelta(seconds=LEASE_SECONDS)}}
+        )
+        return [doc async for doc in collection.find({"claim": token})]
+
+    async def dispatch_batch(self) -> int:
+        batch = await self.claim()
+        if batch:
+            await asyncio.gather(*(self.dispatch(request) for request in batch))
+        return len(batch)
+
+    async def send(self, user_email: str, sections: List[str]) -> Optional[str]:
+        if not self.worker_url:
+            raise EmbedderError("Worker URL not configured", retryable=False)
+        try:
+            async with self.semaphore:
+                with WORKER_REQUEST_SECONDS.time():
+                    response = await self.client.post(
+                        f"{self.worker_url}/precompute-embedding",
+                        json={"email": user_email, "sections": sections}
+                    )
+        except httpx.HTTPError as e:
+            raise EmbedderError(f"{type(e).__name__}: {e}")
+        if response.status_code >= 400:
+            retryable = response.status_code >= 500 or response.status_code == 429
+            raise EmbedderError(f"worker returned {response.status_code}", retryable=retryable)
+        try:
+            return response.json().get("task_id")
+        except ValueError:
+            raise EmbedderError("worker returned invalid JSON")
+
+    async def dispatch(self, request: dict):
+        db = mongo.get_database()
+        collection = outbox_collection(db)
+        try:
+            task_id = await self.send(request["_id"], request.get("sections", []))
+        except EmbedderError as e:
+            attempts = request["attempts"] + 1
+            now = datetime.utcnow()
+            if e.retryable and attempts < MAX_ATTEMPTS:
+                delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+                update = {"status": PENDING, "available_at": now + timedelta(seconds=delay)}
+            else:
+                update = {"status": FAILED}
+            REQUESTS.labels("retry" if update["status"] == PENDING else "failed").inc()
+            print(f"Embedding request for {request['_id']} failed (attempt {attempts}): {e}")
+            await collection.update_one(
+                {"_id": request["_id"], "claim": request["claim"]},
+                {"$set": {**update, "attempts": attempts, "error": str(e), "updated_at": now}}
+            )
+            return
+
+        REQUESTS.labels("sent").inc()
+        now = datetime.utcnow()
+        if ObjectId.is_valid(request["resume_id"]):
+            await db.resumes.update_one(
+                {"_id": ObjectId(request["resume_id"])},
+                {"$set": {
+                    "embedding_task_id": task_id,
+                    "embedding_sections": request.get("sections", []),
+                    "embedding_requested_at": now,
+                }}
+            )
+        # a request that arrived while this one was in flight bumped the version and must still go out
+        result = await collection.delete_one({"_id": request["_id"], "version": request["version"]})
+        if not result.deleted_count:
+            await collection.update_one(
+                {"_id": request["_id"]},
+                {"$set": {"status": PENDING, "attempts": 0, "available_at": now}, "$unset": {"claim": "", "lease_until": ""}}
+            )
+
+
+dispatcher: Optional[EmbedderDispatcher] = None
+
+
+def start_dispatcher() -> EmbedderDispatcher:
+    global dispatcher
+    if dispatcher is None:
+        dispatcher = EmbedderDispatcher()
+        dispatcher.start()
+    return dispatcher
+
+
+async def stop_dispatcher():
+    global dispatcher
+    if dispatcher is not None:
+        await dispatcher.stop()
+        dispatcher = None
@@ -0,0 +1,194 @@
+## background probes of mongodb, the embedding worker and gemini, cached for the health endpoints
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+from app.db import mongo
+from app.utils.metrics import CallbackMetric
+
+PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "10"))
+# gemini is probed less often; the metadata call is free but still counts against rate limits
+LLM_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_LLM_PROBE_INTERVAL_SECONDS", "60"))
+PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "2"))
+# dependencies that must be up for /health/ready; the others only mark the service degraded
+REQUIRED = [name.strip() for name in os.getenv("HEALTH_REQUIRED", "mongodb").split(",") if name.strip()]
+WORKER_URL = os.getenv("WORKER_URL")
+WORKER_HEALTH_PATH = os.getenv("WORKER_HEALTH_PATH", "/health")
+LLM_HEALTH_URL = os.getenv(
+    "LLM_HEALTH_URL", "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash"
+)
+
+UP = "up"
+DOWN = "down"
+UNKNOWN = "unknown"
+DISABLED = "disabled"
+
+
+class ProbeFailed(Exception):
+    pass
+
+
+class Probe:
+    """One dependency check and its last result.
+
+    `check` raises on failure; anything slower than the timeout counts as down.
+    """
+
+    def __init__(self, name: str, check: Optional[Callable[[], Awaitable[None]]], interval: float):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        self.result = {"status": UNKNOWN if check else DISABLED, "consecutive_failures": 0}
+
+    @property
+    def stale(self) -> bool:
+        """True when the last result is older than a few intervals, e.g. because the probe loop died."""
+        checked = self.result.get("checked_monotonic")
+        return checked is None or time.monotonic() - checked > 3 * self.interval + PROBE_TIMEOUT_SECONDS
+
+    def status(self) -> str:
+        if self.check is None:
+            return DISABLED
+        return UNKNOWN if self.stale else self.result["status"]
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.check(), timeout=PROBE_TIMEOUT_SECONDS)
+            status, error = UP, None
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            status, error = DOWN, f"timed out after {PROBE_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            status, error = DOWN, f"{type(e).__name__}: {e}"
+        failures = 0 if status == UP else self.result["consecutive_failures"] + 1
+        if status != self.result["status"]:
+            print(f"Health: {self.name} is {status}" + (f" ({error})" if error else ""))
+        self.result = {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.utcnow().isoformat(),
+            "checked_monotonic": time.monotonic(),
+            "consecutive_failures": failures,
+            "error": error,
+        }
+
+    async def run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def report(self) -> dict:
+        report = {key: value for key, value in self.result.items() if key != "checked_monotonic"}
+        report["status"] = self.status()
+        return report
+
+
+class HealthProber:
+    """Probes each dependency on its own interval in background tasks.
+
+    Health endpoints only read the cached results, so a hung dependency
+    slows the prober, never the probe requests or other traffic.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, required: List[str] = REQUIRED):
+        self.client = client
+        self.owns_client = client is None
+        self.required = required
+        self.tasks: List[asyncio.Task] = []
+        api_key = os.getenv("GOOGLE_API_KEY")
+        self.probes: Dict[str, Probe] = {
+            probe.name: probe for probe in (
+                Probe("mongodb", self.check_mongodb, PROBE_INTERVAL_SECONDS),
+                Probe("worker", self.check_worker if WORKER_URL else None, PROBE_INTERVAL_SECONDS),
+                Probe("llm", self.check_llm if api_key else None, LLM_PROBE_INTERVAL_SECONDS),
+            )
+        }
+        self.llm_headers = {"x-goog-api-key": api_key or ""}
+
+    async def check_mongodb(self):
+        await mongo.get_database().command("ping")
+
+    async def check_worker(self):
+        response = await self.client.get(f"{WORKER_URL}{WORKER_HEALTH_PATH}")
+        # any answer below 500 means the worker process is up and serving
+        if response.status_code >= 500:
+            raise ProbeFailed(f"worker returned {response.status_code}")
+
+    async def check_llm(self):
+        response = await self.client.get(LLM_HEALTH_URL, headers=self.llm_headers)
+        if response.status_code >= 400:
+            raise ProbeFailed(f"Gemini returned {response.status_code}")
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(PROBE_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=2, max_keepalive_connections=2)
+            )
+        for probe in self.probes.values():
+            if probe.check is not None:
+                self.tasks.append(asyncio.create_task(probe.run(), name=f"health:{probe.name}"))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.client is not None and self.owns_client:
+            await self.client.aclose()
+            self.client = None
+
+    def ready(self) -> bool:
+        return all(self.probes[name].status() == UP for name in self.required if name in self.probes)
+
+    def report(self) -> dict:
+        checks = {name: probe.report() for name, probe in self.probes.items()}
+        ready = self.ready()
+        degraded = any(check["status"] in (DOWN, UNKNOWN) for check in checks.values())
+        return {
+            "status": "ready" if ready and not degraded else "degraded" if ready else "unavailable",
+            "ready": ready,
+            "required": self.required,
+            "checks": checks,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+
+prober: Optional[HealthProber] = None
+
+
+def start_prober() -> HealthProber:
+    global prober
+    if prober is None:
+        prober = HealthProber()
+        prober.start()
+    return prober
+
+
+async def stop_prober():
+    global prober
+    if prober is not None:
+        await prober.stop()
+        prober = None
+
+
+def probe_metric(value: Callable[[Probe], float]) -> Callable[[], Dict[tuple, float]]:
+    def collect():
+        if prober is None:
+            return {}
+        return {(name,): value(probe) for name, probe in prober.probes.items() if probe.check is not None}
+    return collect
+
+
+CallbackMetric(
+    "dependency_up", "1 when the last health probe of the dependency succeeded",
+    probe_metric(lambda probe: 1 if probe.status() == UP else 0), labels=["dependency"]
+)
+CallbackMetric(
+    "dependency_probe_latency_seconds", "Duration of the last health probe",
+    probe_metric(lambda probe: round(probe.result.get("latency_ms", 0) / 1000, 4)), labels=["dependency"]
+)
@@ -0,0 +1,153 @@
+## ranks the jobs catalog against a parsed resume with one sparse matrix-vector product
+import math
+from array import array
+from typing import Any, Dict, Iterable, List
+import numpy as np
+from app.services.normalize import tokenize
+from app.services.search_index import STOPWORDS, STORED_FIELDS
+
+# how strongly each resume section counts towards the query vector
+SECTION_WEIGHTS = {
+    'preferences': 2.0,
+    'experience': 1.5,
+    'skills': 1.0,
+    'projects': 0.5,
+    'certifications': 0.5,
+}
+COMPACT_RATIO = 0.25
+
+
+def flatten_text(value: Any) -> str:
+    """Joins every string inside a (possibly nested) resume section."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(flatten_text(v) for v in value)
+    return ''
+
+
+def term_weights(tokens: Iterable[str]) -> Dict[str, float]:
+    """Sublinear tf weights scaled to unit length."""
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        if token not in STOPWORDS:
+            counts[token] = counts.get(token, 0) + 1
+    weights = {term: 1 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+class JobMatcher:
+    """Sparse job x term weight matrix kept in COO form and grown incrementally.
+
+    Each ingested job appends its normalized title weights as (row, column,
+    value) triples; a changed job tombstones its old row. Scoring a resume
+    builds an idf-weighted query vector and computes every job's score in a
+    single vectorized product, then picks the top k with argpartition.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.docs: List[dict] = []
+        self.rows_by_id: Dict[str, int] = {}
+        self.vocabulary: Dict[str, int] = {}
+        self.document_frequency = array('I')
+        self.row_index = array('I')
+        self.column_index = array('I')
+        self.values = array('f')
+        self.alive = bytearray()
+        self.row_terms: List[array] = []
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.rows_by_id)
+
+    def column(self, term: str) -> int:
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = self.vocabulary[term] = len(self.vocabulary)
+            self.document_frequency.append(0)
+        return column
+
+    def add(self, job: dict):
+        """Adds a job's row, replacing the previous row for the same id."""
+        stored = {field: job.get(field) for field in STORED_FIELDS}
+        previous = self.rows_by_id.get(job['id'])
+        if previous is not None:
+            if self.docs[previous] == stored:
+                return
+            self.remove_row(previous)
+
+        row = len(self.docs)
+        self.docs.append(stored)
+        self.rows_by_id[job['id']] = row
+        self.alive.append(1)
+        columns = array('I')
+        for term, weight in term_weights(tokenize(job.get('title', ''))).items():
+            column = self.column(term)
+            self.document_frequency[column] += 1
+            columns.append(column)
+            self.row_index.append(row)
+            self.column_index.append(column)
+            self.values.append(weight)
+        self.row_terms.append(columns)
+
+    def add_many(self, jobs: Iterable[dict]):
+        for job in jobs:
+            self.add(job)
+        if self.dead > COMPACT_RATIO * len(self.docs):
+            self.compact()
+
+    def remove_row(self, row: int):
+        self.alive[row] = 0
+        for column in self.row_terms[row]:
+            self.document_frequency[column] -= 1
+        self.dead += 1
+
+    def compact(self):
+        """Rebuilds the matrix without tombstoned rows."""
+        live = [doc for doc, alive in zip(self.docs, self.alive) if alive]
+        self.clear()
+        for doc in live:
+            self.add(doc)
+
+    def query_vector(self, resume: dict) -> np.ndarray:
+        """Idf-weighted vector over the job vocabulary built from the resume sections."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        job_count = len(self.rows_by_id)
+        for section, section_weight in SECTION_WEIGHTS.items():
+            for term, weight in term_weights(tokenize(flatten_text(resume.get(section)))).items():
+                column = self.vocabulary.get(term)
+                if column is None or not self.document_frequency[column]:
+                    continue
+                idf = math.log(1 + job_count / self.document_frequency[column])
+                vector[column] += section_weight * weight * idf
+        return vector
+
+    def match(self, resume: dict, k: int = 20) -> List[dict]:
+        """Returns the k best-matching jobs for a resume, best first."""
+        if not self.rows_by_id:
+            return []
+        query = self.query_vector(resume)
+        if not query.any():
+            return []
+
+        rows = np.frombuffer(self.row_index, dtype=np.uint32)
+        columns = np.frombuffer(self.column_index, dtype=np.uint32)
+        values = np.frombuffer(self.values, dtype=np.float32)
+        # sparse matrix-vector product: sum value * query[column] per row
+        scores = np.bincount(rows, weights=values * query[columns], minlength=len(self.docs))
+        scores[np.frombuffer(self.alive, dtype=np.uint8) == 0] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [{**self.docs[row], 'score': round(float(scores[row]), 4)} for row in ranked.tolist()]
+
+
+job_matcher = JobMatcher()
@@ -1,13 +1,12 @@
 
 ## linkedin job scraper to fetch job data from linkedin using rapidapi--not included in v1
 import os
-import requests
-from dotenv import load_dotenv
 from typing import Optional
 
 class LinkedInJobScraper:
+    endpoint = '/active-jb-7d'
+
     def __init__(self):
-        load_dotenv()
         self.base_url = f"https://{os.getenv('RAPIDAPI_HOST')}"
         self.headers = {
             'x-rapidapi-host': os.getenv('RAPIDAPI_HOST'),
@@ -45,6 +44,30 @@ class LinkedInJobScraper:
         Returns:
             List of job listings or None if error
         """
+        params = self.build_params(title_filter, seniority_filter, remote, type_filter, limit, offset)
+        url = f"{self.base_url}{self.endpoint}"
+        # only this manual search path uses requests, so it is not imported with the connector
+        import requests
+
+        try:
+            response = requests.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            return data
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching jobs: {e}")
+            return None
+
+    def build_params(
+        self,
+        title_filter: str,
+        seniority_filter: Optional[str] = None,
+        remote: Optional[bool] = None,
+        type_filter: Optional[str] = None,
+        limit: int = 2,
+        offset: int = 0
+    ) -> dict:
+        """Builds the query parameters for the active jobs endpoint"""
         params = {
             'limit': limit,
             'offset': offset,
@@ -59,18 +82,8 @@ class LinkedInJobScraper:
             
         if type_filter:
             params['type_filter'] = type_filter
-            
-        endpoint = '/active-jb-7d'
-        url = f"{self.base_url}{endpoint}"
-        
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching jobs: {e}")
-            return None
+
+        return params
 
     def parse_job_data(self, response):
         """Parse the API response to extract job listings"""
@@ -1,103 +1,83 @@
 ## functions to get jobs from portals,clean them, save to mongodb
-import feedparser
-import requests
+import asyncio
+import httpx
 import json
-import re
-from datetime import datetime
-from dateutil import parser
+from datetime import datetime, timedelta
 import hashlib
-import html
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConfigurationError
-from dotenv import load_dotenv
-load_dotenv()
-
-def clean_text(text: str) -> str:
-    if not text:
-        return ""
-    text = html.unescape(text)
-    text = re.sub(r'<[^>]+>', '', text)
-    return ' '.join(text.strip().split())
-
-def normalize_date(date_str: str) -> str:
-    try:
-        if not date_str:
-            return datetime.now().strftime('%Y-%m-%d')
-        parsed_date = parser.parse(date_str, ignoretz=True)
-        return parsed_date.strftime('%Y-%m-%d')
-    except:
-        return datetime.now().strftime('%Y-%m-%d')
-
-def generate_id(url: str) -> str:
-    return hashlib.md5(url.encode('utf-8')).hexdigest()
-
-def is_engineering_job(title: str) -> bool:
-    pattern = r'\b(?!sales\s)(engineer(ing)?|software|sde|developer|dev)\b'
-    return bool(re.search(pattern, title, re.IGNORECASE))
-
-def parse_wwr_title(title: str) -> tuple:
-    company = 'Unknown'
-    job_title = clean_text(title)
-    
-    if ': ' in title:
-        parts = title.split(': ', 1)
-        company = clean_text(parts[0])
-        job_title = clean_text(parts[1])
-    elif ' at ' in title:
-        parts = title.split(' at ', 1)
-        job_title = clean_text(parts[0])
-        company = clean_text(parts[1])
-    
-    company = re.sub(r'\s*\(?\s*hiring\s*\)?', '', company, flags=re.IGNORECASE).strip()
-    
-    return company, job_title
-
-def fetch_wwr_jobs(existing_urls: set) -> list:
-    jobs = []
-    feed = feedparser.parse('https://weworkremotely.com/remote-jobs.rss')
-    if not feed.entries:
-        print("WWR feed empty or failed")
-        return jobs
-    for entry in feed.entries:
-        company, title = parse_wwr_title(entry.title)
-        job = {
-            'id': generate_id(entry.link),
-            'title': title,
-            'company': company,
-            'url': entry.link,
-            'date': normalize_date(entry.get('published', '')),
-            'source': 'We Work Remotely'
-        }
-        if is_engineering_job(job['title']) and job['url'] not in existing_urls:
-            jobs.append(job)
-            existing_urls.add(job['url'])
-    return jobs
-
-def fetch_remoteok_jobs(existing_urls: set) -> list:
-    jobs = []
-    try:
-        response = requests.get('https://remoteok.com/api', timeout=10)
-        response.raise_for_status()
-        data = response.json()[1:]
-        for entry in data:
-            job_date = normalize_date(entry.get('date', ''))
-            if (datetime.now() - parser.parse(job_date)).days > 7:
-                continue
-            job = {
-                'id': generate_id(entry['url']),
-                'title': clean_text(entry.get('position', 'Untitled')),
-                'company': clean_text(entry.get('company', 'Unknown')),
-                'url': entry['url'],
-                'date': job_date,
-                'source': 'Remote OK'
-            }
-            if is_engineering_job(job['title']) and job['url'] not in existing_urls:
-                jobs.append(job)
-                existing_urls.add(job['url'])
-    except requests.RequestException as e:
-        print(f"Remote OK fetch failed: {e}")
-    return jobs
+import socket
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConfigurationError, DuplicateKeyError
+from app.db import mongo
+from app.services.catalog_version import catalog_version
+# normalization helpers live in app.services.normalize; re-exported here for existing imports
+from app.services.normalize import clean_text, generate_id, is_engineering_job, normalize_date, parse_wwr_title
+
+BULK_BATCH_SIZE = int(os.getenv("JOBS_BULK_BATCH_SIZE", "500"))
+HASHED_FIELDS = ('title', 'company', 'url', 'date', 'source')
+FEED_TIMEOUT_SECONDS = float(os.getenv("FEED_TIMEOUT_SECONDS", "15"))
+HTTP_USER_AGENT = "JobGenie/1.0"
+
+@dataclass
+class FeedFetch:
+    source: str
+    content: bytes
+    validators: dict
+    # ids in this fetch that were not in the seen index; marked seen after a successful save
+    new_ids: Set[str] = field(default_factory=set)
+
+async def conditional_get(
+    client: httpx.AsyncClient,
+    db: AsyncIOMotorDatabase,
+    source: str,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> Optional[FeedFetch]:
+    """GETs a feed with the validators stored for the source; returns None when the feed is unchanged."""
+    state = await db["feed_state"].find_one({"_id": source}) or {}
+    headers = dict(headers or {})
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    response = await client.get(url, params=params, headers=headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+
+    # Some feeds ignore validators, so an identical body is treated like a 304 too
+    body_hash = hashlib.sha1(response.content).hexdigest()
+    if state.get("body_hash") == body_hash:
+        return None
+    validators = {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "body_hash": body_hash,
+    }
+    return FeedFetch(source=source, content=response.content, validators=validators)
+
+async def save_feed_state(db: AsyncIOMotorDatabase, fetch: FeedFetch):
+    """Persists validators once the jobs from a fetch have been saved."""
+    await db["feed_state"].update_one(
+        {"_id": fetch.source},
+        {"$set": {**fetch.validators, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+def create_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client shared by every source in an ingestion run."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(FEED_TIMEOUT_SECONDS, connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        headers={"User-Agent": HTTP_USER_AGENT},
+        follow_redirects=True
+    )
 
 def deduplicate_jobs(jobs: list) -> list:
     seen_urls = set()
@@ -108,52 +88,139 @@ def deduplicate_jobs(jobs: list) -> list:
             unique_jobs.append(job)
     return unique_jobs
 
-def save_to_mongodb(jobs: list):
-    try:
+def content_hash(job: dict) -> str:
+    """Hash of the normalized job fields, stored with the job to detect unchanged entries."""
+    payload = json.dumps([job.get(field) for field in HASHED_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+async def save_batch(collection, batch: list, stats: dict):
+    hashes = {job['id']: content_hash(job) for job in batch}
+    stored = {}
+    async for doc in collection.find({'id': {'$in': list(hashes)}}, {'_id': 0, 'id': 1, 'content_hash': 1}):
+        stored[doc['id']] = doc.get('content_hash')
+
+    operations = []
+    now = datetime.utcnow()
+    for job in batch:
+        job_hash = hashes[job['id']]
+        if stored.get(job['id']) == job_hash:
+            stats['unchanged'] += 1
+            continue
+        # updated_at drives incremental catalog sync, so it only moves when content changes
+        operations.append(UpdateOne(
+            {'id': job['id']},
+            {'$set': {**job, 'content_hash': job_hash, 'updated_at': now}},
+            upsert=True
+        ))
+    if not operations:
+        return
 
-        client = MongoClient(os.getenv("MONGODB_URI"), serverSelectionTimeoutMS=5000)
-        db = client["jobs_db"]
-        collection = db["jobs"]
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        stats['failed'] += len(details.get('writeErrors', []))
+        print(f"MongoDB bulk write partially failed: {len(details.get('writeErrors', []))} errors")
+    stats['inserted'] += details.get('nUpserted', 0)
+    stats['updated'] += details.get('nModified', 0)
+    # matched but not modified means the stored document already had these values
+    stats['unchanged'] += details.get('nMatched', 0) - details.get('nModified', 0)
+
+async def save_to_mongodb(jobs: list, db: Optional[AsyncIOMotorDatabase] = None, batch_size: int = BULK_BATCH_SIZE) -> dict:
+    """Upserts jobs in unordered bulk batches, skipping jobs whose content hash is unchanged."""
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    try:
         if not jobs:
             print("No jobs to save to MongoDB")
-            return
-        for job in jobs:
-            collection.update_one(
-                {"id": job["id"]},
-                {"$set": job},
-                upsert=True
-            )
-        print(f"Saved {len(jobs)} jobs to MongoDB")
-        client.close()
+            return stats
+        db = db if db is not None else mongo.get_database()
+        collection = db["jobs"]
+        try:
+            for start in range(0, len(jobs), batch_size):
+                await save_batch(collection, jobs[start:start + batch_size], stats)
+        finally:
+            # cached /jobs pages are keyed on this version, so bump it whenever anything was written
+            if stats['inserted'] or stats['updated']:
+                await catalog_version.bump(db)
+        print(
+            f"Saved jobs to MongoDB: {stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['failed']} failed"
+        )
     except ConfigurationError as e:
         print(f"MongoDB connection failed: {e}")
+        stats['failed'] = len(jobs) - stats['inserted'] - stats['updated'] - stats['unchanged']
     except Exception as e:
         print(f"MongoDB save failed: {e}")
+        stats['failed'] = len(jobs) - stats['inserted'] - stats['updated'] - stats['unchanged']
+    return stats
 
-def main():
-    existing_urls = set()
-    if os.path.exists('cleaned_jobs.json'):
-        with open('cleaned_jobs.json', 'r', encoding='utf-8') as f:
-            existing_jobs = json.load(f)
-            existing_urls = {job['url'] for job in existing_jobs}
-            print(f"Loaded {len(existing_jobs)} existing jobs for deduplication")
-
-    wwr_jobs = fetch_wwr_jobs(existing_urls)
-    remoteok_jobs = fetch_remoteok_jobs(existing_urls)
-
-    all_jobs = wwr_jobs + remoteok_jobs
-    unique_jobs = deduplicate_jobs(all_jobs)
+def lease_owner() -> str:
+    """Identifies this process in ingestion_locks leases."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 
-    unique_jobs.sort(key=lambda x: x['date'], reverse=True)
-
-    save_to_mongodb(unique_jobs)
+async def acquire_ingestion_lease(db: AsyncIOMotorDatabase, source: str, owner: str, seconds: float) -> bool:
+    """Takes or extends the lease on a source's ingestion; False while another process holds it."""
+    now = datetime.utcnow()
+    try:
+        await db["ingestion_locks"].find_one_and_update(
+            {'_id': source, '$or': [{'locked_until': {'$lt': now}}, {'owner': owner}]},
+            {'$set': {'owner': owner, 'locked_until': now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # the lease exists and is held by another process
+        return False
+
+async def release_ingestion_lease(db: AsyncIOMotorDatabase, source: str, owner: str):
+    await db["ingestion_locks"].update_one(
+        {'_id': source, 'owner': owner},
+        {'$set': {'locked_until': datetime.utcnow()}}
+    )
+
+async def run_ingestion():
+    """Runs every connector once, skipping sources a scheduler or another run is ingesting right now."""
+    # imported here because the connectors build on the helpers in this module
+    from app.services.sources import default_connectors
+
+    db = mongo.get_database()
+    connectors = default_connectors()
+    owner = lease_owner()
+
+    async def run_leased(connector):
+        if not await acquire_ingestion_lease(db, connector.key, owner, connector.interval_seconds + connector.timeout_seconds):
+            print(f"Skipping {connector.name}: another ingestion run holds its lease")
+            return None
+        try:
+            return await connector.run(client, db)
+        finally:
+            await release_ingestion_lease(db, connector.key, owner)
+
+    async with create_http_client() as client:
+        results = await asyncio.gather(
+            *(run_leased(connector) for connector in connectors),
+            return_exceptions=True
+        )
+
+    print("\nIngestion summary:")
+    for connector, result in zip(connectors, results):
+        if isinstance(result, Exception):
+            print(f" - {connector.name}: failed ({type(result).__name__}: {result})")
+        elif result is None:
+            print(f" - {connector.name}: skipped (lease held elsewhere)")
+        else:
+            print(f" - {connector.name}: {result}")
 
-    print(f"\nTotal engineering jobs fetched: {len(unique_jobs)}")
-    print(f" - WWR: {len(wwr_jobs)}")
-    print(f" - Remote OK: {len(remoteok_jobs)}")
-    print("\nSample (first 3 jobs or fewer):")
-    for job in unique_jobs[:3]:
-        print(json.dumps(job, indent=2, ensure_ascii=False))
+def main():
+    async def _run():
+        mongo.connect()
+        try:
+            await run_ingestion()
+        finally:
+            mongo.close()
+
+    asyncio.run(_run())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
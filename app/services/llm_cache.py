@@ -0,0 +1,149 @@
+## content-addressed cache of llm extraction results: in-process lru in front of a mongodb collection
+import copy
+import hashlib
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+from app.db import mongo
+from app.utils.metrics import CallbackMetric
+from app.utils.ttl_cache import TTLCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_MAX_DOCUMENTS = int(os.getenv("LLM_CACHE_MAX_DOCUMENTS", "50000"))
+# the stored collection is trimmed back to LLM_CACHE_MAX_DOCUMENTS every this many writes
+TRIM_EVERY_WRITES = 100
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of extracted text: NFKC, whitespace runs collapsed, trimmed."""
+    return WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(text: str, model: str, prompt_version: str) -> str:
+    """sha256 over the model, prompt version and normalized text."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Caches parsed LLM output by the content it was extracted from.
+
+    Lookups hit the in-process LRU first, then the llm_cache collection, so a
+    re-uploaded resume skips the model call on any worker. Stored entries
+    expire through the TTL index on expires_at (app.db.indexes), and the
+    collection is trimmed to its least recently used LLM_CACHE_MAX_DOCUMENTS.
+    Cache failures are logged and treated as misses; they never fail an
+    extraction.
+    """
+
+    def __init__(
+        self,
+        db: Optional[AsyncIOMotorDatabase] = None,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_documents: int = LLM_CACHE_MAX_DOCUMENTS,
+    ):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_documents = max_documents
+        self.memory = TTLCache(memory_entries, ttl_seconds)
+        self.writes = 0
+        self.counters = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0, "trimmed": 0, "errors": 0}
+
+    @property
+    def collection(self):
+        return (self.db if self.db is not None else mongo.get_database())["llm_cache"]
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Returns a copy of the cached result for key, or None."""
+        result = self.memory.get(key)
+        if result is not None:
+            self.counters["memory_hits"] += 1
+            return copy.deepcopy(result)
+
+        now = datetime.utcnow()
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$gt": now}},
+                {"$set": {"last_used_at": now}, "$inc": {"hits": 1}},
+                {"result": 1, "expires_at": 1}
+            )
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"LLM cache lookup failed: {e}")
+            doc = None
+        if doc is None:
+            self.counters["misses"] += 1
+            return None
+
+        self.counters["store_hits"] += 1
+        remaining = (doc["expires_at"] - now).total_seconds()
+        self.memory.set(key, doc["result"], ttl=remaining)
+        return copy.deepcopy(doc["result"])
+
+    async def put(self, key: str, result: dict, model: str, prompt_version: str):
+        self.memory.set(key, copy.deepcopy(result))
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {
+                    "$set": {
+                        "result": result,
+                        "model": model,
+                        "prompt_version": prompt_version,
+                        "created_at": now,
+                        "last_used_at": now,
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                    },
+                    "$setOnInsert": {"hits": 0},
+                },
+                upsert=True
+            )
+            self.counters["writes"] += 1
+            self.writes += 1
+            if self.writes % TRIM_EVERY_WRITES == 0:
+                await self.trim()
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"LLM cache write failed: {e}")
+
+    async def trim(self):
+        """Deletes the least recently used entries beyond max_documents."""
+        surplus = await self.collection.estimated_document_count() - self.max_documents
+        if surplus <= 0:
+            return
+        cursor = self.collection.find({}, {"_id": 1}).sort("last_used_at", ASCENDING).limit(surplus)
+        ids = [doc["_id"] async for doc in cursor]
+        if ids:
+            result = await self.collection.delete_many({"_id": {"$in": ids}})
+            self.counters["trimmed"] += result.deleted_count
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["memory_hits"] + self.counters["store_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "memory_size": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+extraction_cache = ExtractionCache()
+
+CallbackMetric(
+    "llm_cache_events", "Extraction cache lookups, writes and errors",
+    lambda: {(event,): count for event, count in extraction_cache.counters.items()}, labels=["event"], kind="counter"
+)
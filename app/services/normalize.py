@@ -0,0 +1,155 @@
+## fast-path normalization of job feed entries: precompiled patterns, memoized dates, whole-feed batches
+import hashlib
+import html
+import re
+from datetime import date, datetime, timedelta
+from email.utils import parsedate
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from dateutil import parser
+
+TAG_RE = re.compile(r'<[^>]+>')
+ENGINEERING_RE = re.compile(r'\b(?!sales\s)(engineer(ing)?|software|sde|developer|dev)\b', re.IGNORECASE)
+HIRING_RE = re.compile(r'\s*\(?\s*hiring\s*\)?', re.IGNORECASE)
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:$|[T ])')
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+
+DATE_CACHE_SIZE = 8192
+
+
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+    # most feed fields carry neither markup nor entities
+    if '&' in text:
+        text = html.unescape(text)
+    if '<' in text:
+        text = TAG_RE.sub('', text)
+    return ' '.join(text.split())
+
+
+def generate_id(url: str) -> str:
+    return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+
+def is_engineering_job(title: str) -> bool:
+    return ENGINEERING_RE.search(title) is not None
+
+
+def parse_wwr_title(title: str) -> Tuple[str, str]:
+    company = 'Unknown'
+
+    if ': ' in title:
+        company, job_title = title.split(': ', 1)
+        company = clean_text(company)
+        job_title = clean_text(job_title)
+    elif ' at ' in title:
+        job_title, company = title.split(' at ', 1)
+        job_title = clean_text(job_title)
+        company = clean_text(company)
+    else:
+        job_title = clean_text(title)
+
+    company = HIRING_RE.sub('', company).strip()
+
+    return company, job_title
+
+
+def today() -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str: str) -> Optional[str]:
+    """Parses a feed date to YYYY-MM-DD, ignoring timezones; None when unparseable.
+
+    ISO-8601 and RFC-822 strings, which is what the feeds send, are handled
+    without dateutil; anything else falls back to dateutil.parser.
+    """
+    match = ISO_DATE_RE.match(date_str)
+    if match:
+        try:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3))).isoformat()
+        except ValueError:
+            return None
+    try:
+        parts = parsedate(date_str)
+        if parts:
+            return date(parts[0], parts[1], parts[2]).isoformat()
+    except (ValueError, TypeError, IndexError):
+        pass
+    try:
+        return parser.parse(date_str, ignoretz=True).strftime('%Y-%m-%d')
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def normalize_date(date_str: str) -> str:
+    # missing or bad dates mean "today", which must not be memoized
+    if not date_str:
+        return today()
+    return parse_date(date_str) or today()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; keeps spellings such as c++, c# and node.js in one piece."""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def normalize_wwr_entries(entries: Iterable, source: str) -> List[dict]:
+    """Normalizes a whole We Work Remotely feed in one pass."""
+    jobs = []
+    append = jobs.append
+    for entry in entries:
+        link = entry.link
+        company, title = parse_wwr_title(entry.title)
+        append({
+            'id': generate_id(link),
+            'title': title,
+            'company': company,
+            'url': link,
+            'date': normalize_date(entry.get('published', '')),
+            'source': source
+        })
+    return jobs
+
+
+def normalize_remoteok_entries(entries: Iterable[dict], source: str, max_age_days: int) -> List[dict]:
+    """Normalizes a whole Remote OK feed in one pass, dropping entries older than max_age_days."""
+    # YYYY-MM-DD strings order like dates, so the age check is a string comparison
+    cutoff = (date.today() - timedelta(days=max_age_days)).isoformat()
+    jobs = []
+    append = jobs.append
+    for entry in entries:
+        job_date = normalize_date(entry.get('date', ''))
+        if job_date < cutoff:
+            continue
+        url = entry['url']
+        append({
+            'id': generate_id(url),
+            'title': clean_text(entry.get('position', 'Untitled')),
+            'company': clean_text(entry.get('company', 'Unknown')),
+            'url': url,
+            'date': job_date,
+            'source': source
+        })
+    return jobs
+
+
+def normalize_linkedin_entries(entries: Iterable[dict], source: str) -> List[dict]:
+    """Normalizes a whole LinkedIn API response in one pass."""
+    jobs = []
+    append = jobs.append
+    for entry in entries:
+        url = entry['url']
+        append({
+            'id': generate_id(url),
+            'title': clean_text(entry.get('title', 'Untitled')),
+            'company': clean_text(entry.get('organization', 'Unknown')),
+            'url': url,
+            'date': normalize_date(entry.get('date_posted', '')),
+            'source': source
+        })
+    return jobs
@@ -0,0 +1,131 @@
+## bcrypt hashing on a dedicated bounded thread pool, with logins served before signups
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so hashes on separate threads run in parallel
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# waiting requests beyond these are turned away with 429
+MAX_QUEUED_LOGINS = int(os.getenv("PASSWORD_HASH_MAX_QUEUED_LOGINS", "64"))
+MAX_QUEUED_SIGNUPS = int(os.getenv("PASSWORD_HASH_MAX_QUEUED_SIGNUPS", "16"))
+
+LOGIN = 0
+SIGNUP = 1
+
+pwd_context: Optional["CryptContext"] = None
+
+
+def get_pwd_context() -> "CryptContext":
+    """The bcrypt context, built on first use so passlib is not imported with the app.
+
+    Hashes made with fewer rounds than BCRYPT_ROUNDS are flagged for rehash
+    on the next login.
+    """
+    global pwd_context
+    if pwd_context is None:
+        from passlib.context import CryptContext
+        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+    return pwd_context
+
+
+class HashPoolFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs password hashing on its own executor so it never takes Starlette's threadpool.
+
+    At most `workers` hashes run at once. Waiting requests are served by
+    priority (logins before signups) and then in arrival order; each
+    priority has its own queue limit, beyond which callers get HashPoolFull.
+    """
+
+    def __init__(
+        self,
+        workers: int = HASH_WORKERS,
+        max_queued: Tuple[int, int] = (MAX_QUEUED_LOGINS, MAX_QUEUED_SIGNUPS),
+        context: Optional["CryptContext"] = None,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.custom_context = context
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.running = 0
+        self.waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self.queued = [0, 0]
+        self.sequence = itertools.count()
+        # moving average of one hash, used for Retry-After
+        self.average_seconds = 0.25
+
+    @property
+    def context(self) -> "CryptContext":
+        return self.custom_context or get_pwd_context()
+
+    async def acquire(self, priority: int):
+        if self.running < self.workers and not self.waiting:
+            self.running += 1
+            return
+        if self.queued[priority] >= self.max_queued[priority]:
+            raise HashPoolFull(self.retry_after())
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, (priority, next(self.sequence), future))
+        self.queued[priority] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just as we were cancelled
+                self.release()
+            elif any(entry[2] is future for entry in self.waiting):
+                self.queued[priority] -= 1
+                self.waiting = [entry for entry in self.waiting if entry[2] is not future]
+                heapq.heapify(self.waiting)
+            raise
+
+    def release(self):
+        while self.waiting:
+            priority, _, future = heapq.heappop(self.waiting)
+            self.queued[priority] -= 1
+            if not future.done():
+                # the slot passes straight to the next waiter; running stays the same
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    def retry_after(self) -> int:
+        backlog = len(self.waiting) + self.running
+        return max(1, math.ceil(backlog * self.average_seconds / self.workers))
+
+    async def run(self, priority: int, fn: Callable, *args):
+        await self.acquire(priority)
+        try:
+            started = time.perf_counter()
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            self.average_seconds = 0.9 * self.average_seconds + 0.1 * (time.perf_counter() - started)
+            return result
+        finally:
+            self.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(SIGNUP, self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Checks a password; also returns a new hash when the stored one uses outdated settings."""
+        return await self.run(LOGIN, self.context.verify_and_update, password, hashed)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
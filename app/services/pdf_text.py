@@ -0,0 +1,25 @@
+## pdf text extraction, kept free of heavy imports so it can run in a separate worker process
+import io
+from typing import List
+
+
+def pdf_reader(data: bytes):
+    # PyPDF2 is imported on first use rather than with the app
+    import PyPDF2
+    return PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def extract_pdf_pages(data: bytes) -> List[str]:
+    """Returns the text of each page of an in-memory PDF."""
+    reader = pdf_reader(data)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """Returns the text of every page of an in-memory PDF."""
+    return "\n".join(extract_pdf_pages(data))
+
+
+def count_pdf_pages(data: bytes) -> int:
+    """Page count from the PDF's page tree, without extracting any text."""
+    return len(pdf_reader(data).pages)
@@ -0,0 +1,169 @@
+## shrinks extracted resume text before it is sent to the llm, within a token budget
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Tuple
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", "3000"))
+# every section keeps at least this many tokens before higher-priority sections get the rest
+MIN_SECTION_TOKENS = 80
+# lines this close to the top or bottom of a page are header/footer candidates
+EDGE_LINES = 3
+CHARS_PER_TOKEN = 4
+
+SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+DIGITS_RE = re.compile(r"\d+")
+CONTENT_RE = re.compile(r"[^\W_]", re.UNICODE)
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?[-–(\[]?\s*\d+\s*([/|]|of)?\s*\d*\s*[-–)\]]?$", re.IGNORECASE)
+# section name -> keep priority (lower keeps more when the budget is tight)
+SECTIONS = {
+    "contact": 0,
+    "summary": 3,
+    "skills": 1,
+    "experience": 2,
+    "education": 4,
+    "projects": 5,
+    "certifications": 6,
+    "preferences": 1,
+    "other": 7,
+}
+HEADING_RE = re.compile(
+    r"^(?:(?P<skills>(technical\s+)?skills|core\s+competencies|technologies|tech\s+stack)"
+    r"|(?P<experience>(work|professional)?\s*experience|employment(\s+history)?|work\s+history)"
+    r"|(?P<education>education|academic\s+background)"
+    r"|(?P<projects>(personal\s+|selected\s+)?projects)"
+    r"|(?P<certifications>certifications?|licen[cs]es(\s+(&|and)\s+certifications)?|courses)"
+    r"|(?P<summary>(professional\s+)?summary|profile|objective|about(\s+me)?)"
+    r"|(?P<preferences>(job\s+)?preferences|availability)"
+    r"|(?P<other>awards|honou?rs|publications|languages|interests|volunteering|references))"
+    r"\s*:?$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class CompactedText:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def clean_line(line: str) -> str:
+    return SPACE_RE.sub(" ", line).strip()
+
+
+def is_content(line: str) -> bool:
+    """False for blank lines, bare page numbers and pure punctuation rules or bullets."""
+    return bool(line) and CONTENT_RE.search(line) is not None and not PAGE_NUMBER_RE.match(line)
+
+
+def repeated_edges(pages: List[List[str]]) -> set:
+    """Lines (digits masked) that open or close at least half the pages."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({DIGITS_RE.sub("#", line) for line in edges})
+    threshold = max(2, math.ceil(len(pages) / 2))
+    return {line for line, count in counts.items() if count >= threshold}
+
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Groups lines under the resume heading they follow; text before the first heading is contact."""
+    sections = [("contact", [])]
+    for line in lines:
+        match = HEADING_RE.match(line) if len(line) < 40 else None
+        if match:
+            sections.append((match.lastgroup, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def allot(sizes: List[int], priorities: List[int], budget: int) -> List[int]:
+    """Splits a token budget: a floor for every section, then the rest in priority order."""
+    floor = min(MIN_SECTION_TOKENS, budget // max(len(sizes), 1))
+    allotted = [min(size, floor) for size in sizes]
+    remaining = budget - sum(allotted)
+    for i in sorted(range(len(sizes)), key=lambda i: priorities[i]):
+        if remaining <= 0:
+            break
+        extra = min(sizes[i] - allotted[i], remaining)
+        allotted[i] += extra
+        remaining -= extra
+    return allotted
+
+
+def cut(text: str, budget: int) -> str:
+    """The start of the text within the budget, ended at a sentence or word boundary when one is near."""
+    limit = max(budget, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    for boundary in (". ", " "):
+        end = head.rfind(boundary)
+        if end > limit // 2:
+            return head[:end + len(boundary) - 1]
+    return head
+
+
+def truncate(lines: List[str], budget: int) -> List[str]:
+    """Keeps lines from the top of a section until the budget is spent; the last one may be cut short.
+
+    PDF extraction often returns a whole page as a single line, so a line
+    that does not fit is cut rather than kept or dropped whole.
+    """
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            rest = cut(line, budget - used - 1)
+            if rest:
+                kept.append(rest)
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def compact_pages(pages: List[str], token_budget: int = PROMPT_TOKEN_BUDGET) -> CompactedText:
+    """Removes repeated headers/footers, whitespace and non-content lines, then fits the budget."""
+    original_tokens = estimate_tokens("\n".join(pages))
+    page_lines = [[clean_line(line) for line in page.splitlines()] for page in pages]
+    page_lines = [[line for line in lines if line] for lines in page_lines]
+    edges = repeated_edges(page_lines)
+
+    lines = []
+    for page_number, page in enumerate(page_lines):
+        for index, line in enumerate(page):
+            at_edge = index < EDGE_LINES or index >= len(page) - EDGE_LINES
+            # the first occurrence of a repeated header (usually the name and contact line) is kept
+            if at_edge and page_number > 0 and DIGITS_RE.sub("#", line) in edges:
+                continue
+            if is_content(line):
+                lines.append(line)
+
+    text = "\n".join(lines)
+    if estimate_tokens(text) > token_budget:
+        sections = split_sections(lines)
+        sizes = [sum(estimate_tokens(line) + 1 for line in body) for _, body in sections]
+        budgets = allot(sizes, [SECTIONS[name] for name, _ in sections], token_budget)
+        text = "\n".join(
+            "\n".join(truncate(body, budget)) for (_, body), budget in zip(sections, budgets) if budget > 0
+        )
+        # the per-line estimates round up, but the joins between sections are not counted
+        text = cut(text, token_budget)
+
+    return CompactedText(text=text, original_tokens=original_tokens, tokens=estimate_tokens(text))
@@ -0,0 +1,259 @@
+## durable resume processing jobs: uploads are queued in mongodb and worked off by a bounded pool
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+from bson import Binary, ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from app.db import mongo
+from app.services.resume_parser import ResumeParser
+from app.utils import profiler
+
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", "4"))
+RESUME_PDF_PROCESSES = int(os.getenv("RESUME_PDF_PROCESSES", "2"))
+RESUME_JOB_MAX_ATTEMPTS = int(os.getenv("RESUME_JOB_MAX_ATTEMPTS", "3"))
+# a running job whose lease expires (worker crashed or restarted) is picked up again
+RESUME_JOB_LEASE_SECONDS = int(os.getenv("RESUME_JOB_LEASE_SECONDS", "300"))
+# how often idle workers look for jobs enqueued by other processes
+POLL_INTERVAL_SECONDS = float(os.getenv("RESUME_JOB_POLL_SECONDS", "5"))
+RETRY_BASE_SECONDS = 5
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+STATUS_PROJECTION = {"pdf": 0, "profile": 0}
+
+
+def jobs_collection(db: Optional[AsyncIOMotorDatabase] = None):
+    return (db if db is not None else mongo.get_database())["resume_jobs"]
+
+
+async def enqueue_resume_job(pdf: bytes, filename: str, user_email: str, profile: bool = False) -> str:
+    """Stores the upload as a queued job and wakes a worker; returns the job id.
+
+    With profile set, the worker that runs the job profiles it and stores
+    the collapsed stacks on the job (see get_resume_job_profile).
+    """
+    now = datetime.utcnow()
+    result = await jobs_collection().insert_one({
+        "user_email": user_email,
+        "filename": filename,
+        "pdf": Binary(pdf),
+        "status": QUEUED,
+        "stage": QUEUED,
+        "progress": 0,
+        "attempts": 0,
+        "profile_requested": profile,
+        "available_at": now,
+        "created_at": now,
+        "updated_at": now,
+    })
+    if worker_pool is not None:
+        worker_pool.wake()
+    return str(result.inserted_id)
+
+
+async def get_resume_job(job_id: str) -> Optional[dict]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await jobs_collection().find_one({"_id": ObjectId(job_id)}, STATUS_PROJECTION)
+
+
+async def get_resume_job_profile(job_id: str) -> Optional[str]:
+    """Collapsed stacks of the job's last attempt, once a profiled job has run."""
+    if not ObjectId.is_valid(job_id):
+        return None
+    job = await jobs_collection().find_one({"_id": ObjectId(job_id)}, {"profile": 1})
+    return job.get("profile") if job else None
+
+
+class ResumeJobWorkerPool:
+    """Bounded set of asyncio workers that process queued resume jobs.
+
+    PDF text extraction is CPU-bound and runs in a process pool; the Gemini
+    call and MongoDB writes are awaited on the loop. The embedding request
+    only goes into the embedder outbox, so jobs never wait on the worker.
+    """
+
+    def __init__(self, workers: int = RESUME_WORKERS, processes: int = RESUME_PDF_PROCESSES):
+        self.workers = workers
+        self.processes = processes
+        self.parser: Optional[ResumeParser] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks: List[asyncio.Task] = []
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+
+    def start(self):
+        self.parser = ResumeParser()
+        # spawn, not fork: the parent already holds MongoDB and HTTP client sockets
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.tasks = [
+            asyncio.create_task(self.work(), name=f"resume-worker-{n}") for n in range(self.workers)
+        ]
+
+    async def stop(self):
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def wake(self):
+        self.wakeup.set()
+
+    async def fail_abandoned(self, now: datetime):
+        """Fails running jobs whose lease expired on their last attempt; nothing else would pick them up."""
+        result = await jobs_collection().update_many(
+            {"status": RUNNING, "lease_until": {"$lt": now}, "attempts": {"$gte": RESUME_JOB_MAX_ATTEMPTS}},
+            {
+                "$set": {"status": FAILED, "error": "Worker stopped during the last attempt", "updated_at": now},
+                "$unset": {"pdf": "", "lease_until": ""},
+            }
+        )
+        if result.modified_count:
+            print(f"Failed {result.modified_count} resume job(s) abandoned on their last attempt")
+
+    async def claim(self) -> Optional[dict]:
+        """Atomically takes the oldest queued job, or a running one whose lease expired."""
+        now = datetime.utcnow()
+        await self.fail_abandoned(now)
+        return await jobs_collection().find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "available_at": {"$lte": now}},
+                {"status": RUNNING, "lease_until": {"$lt": now}, "attempts": {"$lt": RESUME_JOB_MAX_ATTEMPTS}},
+            ]},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_until": now + timedelta(seconds=RESUME_JOB_LEASE_SECONDS),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def work(self):
+        # checked as well as cancelling: on python 3.11, wait_for drops a cancel that
+        # arrives just as the wakeup fires, and the loop would poll on forever
+        while not self.stopping:
+            # cleared before claiming so an enqueue that races with an empty claim still wakes us
+            self.wakeup.clear()
+            try:
+                job = await self.claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Failed to claim resume job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process(job)
+
+    async def process(self, job: dict):
+        if not job.get("profile_requested"):
+            return await self.run_job(job)
+        # stored on the job rather than in this process's profile store: any worker process may run it
+        sampler = profiler.TaskSampler(asyncio.current_task())
+        try:
+            sampler.start()
+        except profiler.ProfilerBusy:
+            print(f"Resume job {job['_id']} not profiled: another profile is running")
+            return await self.run_job(job)
+        try:
+            await self.run_job(job, sampler)
+        finally:
+            await jobs_collection().update_one({"_id": job["_id"]}, {"$set": {"profile": sampler.stop()}})
+
+    async def run_job(self, job: dict, sampler: Optional[profiler.Sampler] = None):
+        collection = jobs_collection()
+        job_id = job["_id"]
+
+        async def report(stage: str, progress: int, fields: dict):
+            now = datetime.utcnow()
+            await collection.update_one({"_id": job_id}, {"$set": {
+                "stage": stage,
+                "progress": progress,
+                "updated_at": now,
+                "lease_until": now + timedelta(seconds=RESUME_JOB_LEASE_SECONDS),
+                **fields,
+            }})
+
+        try:
+            resume_id, changed_sections = await self.parser.process_resume(
+                bytes(job["pdf"]),
+                job["user_email"],
+                report=report,
+                pdf_executor=self.executor,
+                resume_id=job.get("resume_id"),
+                changed_sections=job.get("changed_sections"),
+                sampler=sampler,
+            )
+        except asyncio.CancelledError:
+            # leave the job running; its lease expiry hands it to another worker
+            raise
+        except Exception as e:
+            print(f"Resume job {job_id} failed (attempt {job['attempts']}): {e}")
+            now = datetime.utcnow()
+            if job["attempts"] < RESUME_JOB_MAX_ATTEMPTS:
+                delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                update = {
+                    "$set": {"status": QUEUED, "error": str(e), "available_at": now + timedelta(seconds=delay), "updated_at": now},
+                    "$unset": {"lease_until": ""},
+                }
+            else:
+                update = {
+                    "$set": {"status": FAILED, "error": str(e), "updated_at": now},
+                    "$unset": {"pdf": "", "lease_until": ""},
+                }
+            await collection.update_one({"_id": job_id}, update)
+            return
+
+        await collection.update_one({"_id": job_id}, {
+            "$set": {
+                "status": DONE,
+                "stage": DONE,
+                "progress": 100,
+                "resume_id": resume_id,
+                "changed_sections": changed_sections,
+                "error": None,
+                "updated_at": datetime.utcnow(),
+            },
+            # the upload is no longer needed once the resume is saved
+            "$unset": {"pdf": "", "lease_until": ""},
+        })
+
+
+worker_pool: Optional[ResumeJobWorkerPool] = None
+
+
+def start_worker_pool() -> ResumeJobWorkerPool:
+    global worker_pool
+    if worker_pool is None:
+        worker_pool = ResumeJobWorkerPool()
+        worker_pool.start()
+    return worker_pool
+
+
+async def stop_worker_pool():
+    global worker_pool
+    if worker_pool is not None:
+        await worker_pool.stop()
+        worker_pool = None
@@ -1,47 +1,90 @@
 ## gemini llm resume parser to parse and save user resume data
+import asyncio
 import os
-from google import genai
-from markdownify import markdownify as md
-from dotenv import load_dotenv
-import PyPDF2
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import re
 import json
+import hashlib
+import time
 from datetime import datetime
 from app.db.models import Resume
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
-from app.utils.startembeddertask import start_embedder_task
-load_dotenv()
+from app.db.mongo import get_database
+from app.services.embedder_dispatcher import enqueue_embedding
+from app.services.llm_cache import LLM_CACHE_ENABLED, cache_key, extraction_cache
+from app.services.pdf_text import extract_pdf_pages, extract_pdf_text
+from app.services.prompt_compaction import compact_pages
+from app.utils import profiler
+from app.utils.metrics import Histogram
+
+GEMINI_MODEL = "gemini-2.0-flash"
+# bump whenever build_prompt or parse_response changes so cached extractions are not reused
+PROMPT_VERSION = "2"
+
+# parsed sections tracked for change detection and passed to the embedding worker
+RESUME_SECTIONS = ('name', 'contact', 'skills', 'education', 'experience', 'projects', 'certifications', 'preferences')
+SAVE_RETRIES = 3
+
+ProgressCallback = Callable[[str, int, dict], Awaitable[None]]
+
+STAGE_SECONDS = Histogram("resume_stage_duration_seconds", "Time spent in each resume processing stage", labels=["stage"])
+LLM_REQUEST_SECONDS = Histogram("llm_request_duration_seconds", "Gemini extraction calls by outcome", labels=["model", "outcome"])
+
+
+def section_hashes(resume: dict) -> Dict[str, str]:
+    """Stable content hash of each parsed section."""
+    return {
+        section: hashlib.sha256(
+            json.dumps(resume.get(section), sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        for section in RESUME_SECTIONS
+    }
+
+def create_genai_client(api_key: str):
+    # google-genai takes most of a second to import, so it is loaded with the first client instead of the app
+    from google import genai
+    return genai.Client(api_key=api_key)
 
 class ResumeParser:
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
-            raise ValueError("Missing GOOGLE_API_KEY in environment variables.")
-        self.genai_client = genai.Client(api_key=self.api_key)
-        
-        self.mongo_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27018")
-        self.client = AsyncIOMotorClient(self.mongo_uri)
-        self.db = self.client.jobs_db
-        self.resumes_collection = self.db.resumes
-
-    def read_pdf(self, file_path: str) -> str:
-        """Reads a PDF file and returns its text content."""
+            print("GOOGLE_API_KEY is not set; resume extraction will fail until it is")
+        self._genai_client = None
+
+    @property
+    def genai_client(self):
+        """Gemini client, created on first use."""
+        if self._genai_client is None:
+            if not self.api_key:
+                raise ValueError("Missing GOOGLE_API_KEY in environment variables.")
+            self._genai_client = create_genai_client(self.api_key)
+        return self._genai_client
+
+    async def genai_client_async(self):
+        """genai_client, created on a thread the first time so the import does not stall the event loop."""
+        if self._genai_client is None:
+            await asyncio.to_thread(lambda: self.genai_client)
+        return self._genai_client
+
+    @property
+    def resumes_collection(self) -> AsyncIOMotorCollection:
+        """Resumes collection on the shared application client."""
+        return get_database().resumes
+
+    def read_pdf(self, data: bytes) -> str:
+        """Reads an in-memory PDF and returns its text content."""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
+            return extract_pdf_text(data)
         except Exception as e:
             print(f"Error reading PDF: {str(e)}")
             raise
 
-    def extract_resume_data(self, file_text: str) -> dict:
-        """Extracts resume data from a PDF file using Gemini."""
-        
-        prompt = f"""You are a professional resume parser. Please analyze the following resume text and extract the relevant information:
+    def build_prompt(self, file_text: str) -> str:
+        """Builds the Gemini extraction prompt for a resume's text."""
+        return f"""You are a professional resume parser. Please analyze the following resume text and extract the relevant information:
 
  Resume Text:
 {file_text}
@@ -71,14 +114,8 @@ Respond in the following structured JSON format:
 }}
 """
 
-        response = self.genai_client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[
-                prompt
-            ]
-        )
-
-
+    def parse_response(self, response) -> dict:
+        """Parses the JSON object out of a Gemini response."""
         try:
             response_text = response.text.strip()
 
@@ -98,8 +135,50 @@ Respond in the following structured JSON format:
         except Exception as e:
             raise ValueError(f"Failed to parse response JSON: {e}\nRaw response:\n{response.text}")
 
-    async def save_to_mongodb(self, resume_data: dict, user_email: str):
-        """Save parsed resume data to MongoDB."""
+    def extract_resume_data(self, file_text: str) -> dict:
+        """Extracts resume data from resume text using Gemini."""
+        response = self.genai_client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[self.build_prompt(file_text)]
+        )
+        return self.parse_response(response)
+
+    async def extract_resume_data_async(self, file_text: str) -> dict:
+        """Same as extract_resume_data, awaiting Gemini without blocking the event loop."""
+        genai_client = await self.genai_client_async()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await genai_client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=[self.build_prompt(file_text)]
+            )
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.labels(GEMINI_MODEL, outcome).observe(time.perf_counter() - started)
+        return self.parse_response(response)
+
+    async def extract_resume_data_cached(self, file_text: str) -> dict:
+        """Returns a cached extraction for the same text, prompt and model, calling Gemini on a miss."""
+        if not LLM_CACHE_ENABLED:
+            return await self.extract_resume_data_async(file_text)
+        key = cache_key(file_text, GEMINI_MODEL, PROMPT_VERSION)
+        resume_data = await extraction_cache.get(key)
+        if resume_data is not None:
+            print(f"LLM cache hit for {key[:12]}")
+            return resume_data
+        resume_data = await self.extract_resume_data_async(file_text)
+        await extraction_cache.put(key, resume_data, GEMINI_MODEL, PROMPT_VERSION)
+        return resume_data
+
+    async def save_to_mongodb(self, resume_data: dict, user_email: str) -> Tuple[str, List[str]]:
+        """Saves parsed resume data as the user's current resume version.
+
+        A user keeps one resume document. On re-upload only the sections whose
+        hash changed are written and the version is bumped; returns the resume
+        id and the changed section names (empty when nothing changed).
+        """
+        now = datetime.utcnow()
         resume = Resume(
             user_email=user_email,
             name=resume_data.get('name', ''),
@@ -111,30 +190,109 @@ Respond in the following structured JSON format:
             certifications=resume_data.get('certifications', []),
             preferences=resume_data.get('preferences', {}),
             markdown=self.convert_to_markdown(resume_data),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
-        
-        
         resume_dict = resume.model_dump()
-        
-        result = await self.resumes_collection.insert_one(resume_dict)
-        return str(result.inserted_id)
+        hashes = resume_dict["section_hashes"] = section_hashes(resume_dict)
+
+        for _ in range(SAVE_RETRIES):
+            current = await self.resumes_collection.find_one(
+                {"user_email": user_email},
+                {"section_hashes": 1, "version": 1},
+                sort=[("created_at", -1)]
+            )
+            if current is None:
+                result = await self.resumes_collection.insert_one(resume_dict)
+                return str(result.inserted_id), list(RESUME_SECTIONS)
+
+            previous = current.get("section_hashes") or {}
+            changed = [section for section in RESUME_SECTIONS if previous.get(section) != hashes[section]]
+            if not changed:
+                return str(current["_id"]), []
+
+            version = current.get("version", 1)
+            result = await self.resumes_collection.update_one(
+                # resumes saved before versioning have no version field
+                {"_id": current["_id"], "version": current.get("version")},
+                {"$set": {
+                    **{section: resume_dict[section] for section in changed},
+                    "markdown": resume_dict["markdown"],
+                    "section_hashes": hashes,
+                    "version": version + 1,
+                    "updated_at": now,
+                }}
+            )
+            if result.modified_count:
+                return str(current["_id"]), changed
+            # another upload for this user saved first; diff against its version
+
+        raise ValueError(f"Concurrent resume updates for {user_email}")
+
+    async def process_resume(
+        self,
+        pdf: bytes,
+        user_email: str,
+        report: Optional[ProgressCallback] = None,
+        pdf_executor: Optional[Executor] = None,
+        resume_id: Optional[str] = None,
+        changed_sections: Optional[List[str]] = None,
+        sampler: Optional[profiler.Sampler] = None,
+    ) -> Tuple[str, List[str]]:
+        """Process a resume PDF, save it to MongoDB and queue embedding of the changed sections.
+
+        Returns the resume id and the sections that changed. report(stage,
+        progress, fields) is awaited as each stage starts and can persist
+        fields such as the saved resume_id. Passing resume_id and
+        changed_sections resumes a previous attempt after the save stage.
+        With a sampler, the PDF extraction in the executor is profiled too and
+        its stacks are added to the sampler's under "pdf-extraction".
+        """
+        async def stage(name: str, progress: int, **fields):
+            if report is not None:
+                await report(name, progress, fields)
 
-    async def process_resume(self, file_path: str,user_email: str) -> str:
-        """Process a resume file and save to MongoDB."""
         try:
-            file_text = self.read_pdf(file_path)
-            resume_data = self.extract_resume_data(file_text)
-            
-            resume_id = await self.save_to_mongodb(resume_data,user_email)
+            if resume_id is None:
+                await stage("reading_pdf", 10)
+                loop = asyncio.get_running_loop()
+                with STAGE_SECONDS.labels("reading_pdf").time():
+                    if sampler is None:
+                        pages = await loop.run_in_executor(pdf_executor, extract_pdf_pages, pdf)
+                    else:
+                        pages, counts = await loop.run_in_executor(
+                            pdf_executor, profiler.profile_call, sampler.interval, extract_pdf_pages, pdf
+                        )
+                        sampler.include(counts, ("pdf-extraction",))
+                with STAGE_SECONDS.labels("compacting").time():
+                    compacted = compact_pages(pages)
+                print(
+                    f"Resume prompt for {user_email}: {compacted.tokens} tokens "
+                    f"({compacted.tokens_saved} saved from {compacted.original_tokens})"
+                )
+                file_text = compacted.text
+
+                await stage("extracting", 30)
+                with STAGE_SECONDS.labels("extracting").time():
+                    resume_data = await self.extract_resume_data_cached(file_text)
+
+                await stage("saving", 70)
+                with STAGE_SECONDS.labels("saving").time():
+                    resume_id, changed_sections = await self.save_to_mongodb(resume_data, user_email)
+
+            elif changed_sections is None:
+                # saved by an attempt that did not record its changes
+                changed_sections = list(RESUME_SECTIONS)
+
+            await stage("queueing_embedding", 85, resume_id=resume_id, changed_sections=changed_sections)
+            if changed_sections:
+                with STAGE_SECONDS.labels("queueing_embedding").time():
+                    await enqueue_embedding(user_email, resume_id, changed_sections)
+            else:
+                print(f"Resume for {user_email} unchanged, skipping embedding")
 
-            response = start_embedder_task(user_email)
-            task_id = response.get("task_id")
-            
+            return resume_id, changed_sections or []
 
-            return resume_id,task_id
-            
         except Exception as e:
             raise ValueError(f"Failed to process resume: {str(e)}")
 
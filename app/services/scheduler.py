@@ -0,0 +1,112 @@
+## in-process ingestion scheduler: runs each source connector on its own interval with jitter and backoff
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+from app.db import mongo
+from app.services.catalog_sync import catalog_sync
+from app.services.jobs import acquire_ingestion_lease, create_http_client, lease_owner, release_ingestion_lease
+from app.services.sources import SourceConnector, default_connectors
+
+SCHEDULER_ENABLED = os.getenv("INGESTION_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+# fraction of the interval added or removed at random so sources and workers drift apart
+JITTER_RATIO = float(os.getenv("INGESTION_JITTER_RATIO", "0.1"))
+BACKOFF_BASE_SECONDS = float(os.getenv("INGESTION_BACKOFF_BASE_SECONDS", "30"))
+BACKOFF_MAX_SECONDS = float(os.getenv("INGESTION_BACKOFF_MAX_SECONDS", "3600"))
+
+
+class IngestionScheduler:
+    """Runs connectors in background tasks inside the API process.
+
+    A run of a given source never overlaps another run of the same source:
+    an asyncio lock covers this process and a lease document in the
+    ingestion_locks collection covers other workers.
+    """
+
+    def __init__(self, connectors: Optional[List[SourceConnector]] = None):
+        self.connectors = connectors if connectors is not None else default_connectors()
+        self.owner = lease_owner()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.tasks: List[asyncio.Task] = []
+        self.locks: Dict[str, asyncio.Lock] = {c.name: asyncio.Lock() for c in self.connectors}
+        self.status: Dict[str, dict] = {c.name: {'failures': 0} for c in self.connectors}
+
+    def start(self):
+        self.client = create_http_client()
+        for connector in self.connectors:
+            self.tasks.append(asyncio.create_task(self.loop(connector), name=f"ingest:{connector.key}"))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def jittered(self, seconds: float) -> float:
+        return max(0.0, seconds * (1 + random.uniform(-JITTER_RATIO, JITTER_RATIO)))
+
+    def backoff(self, failures: int, interval: float) -> float:
+        """Exponential backoff with full jitter, never longer than the normal interval or the cap."""
+        ceiling = min(BACKOFF_BASE_SECONDS * 2 ** (failures - 1), BACKOFF_MAX_SECONDS, interval)
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def loop(self, connector: SourceConnector):
+        # start each source at a random point in its first interval instead of all at boot
+        delay = random.uniform(0, connector.interval_seconds * JITTER_RATIO)
+        while True:
+            await asyncio.sleep(delay)
+            status = self.status[connector.name]
+            try:
+                await self.run_now(connector)
+                status['failures'] = 0
+                delay = self.jittered(connector.interval_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status['failures'] += 1
+                status['last_error'] = f"{type(e).__name__}: {e}"
+                delay = self.backoff(status['failures'], connector.interval_seconds)
+                print(f"{connector.name} ingestion failed ({status['failures']} in a row), retrying in {delay:.0f}s: {e}")
+            status['next_run_at'] = datetime.utcnow() + timedelta(seconds=delay)
+
+    async def run_now(self, connector: SourceConnector) -> Optional[dict]:
+        """Runs one cycle of a connector unless another run of it is in progress anywhere."""
+        lock = self.locks[connector.name]
+        if lock.locked():
+            return None
+        async with lock:
+            db = mongo.get_database()
+            lease = connector.interval_seconds + connector.timeout_seconds
+            if not await acquire_ingestion_lease(db, connector.key, self.owner, lease):
+                return None
+            try:
+                result = await connector.run(self.client, db)
+            finally:
+                await release_ingestion_lease(db, connector.key, self.owner)
+            self.status[connector.name].update(last_run_at=datetime.utcnow(), last_result=result)
+            if result.get('inserted') or result.get('updated'):
+                await catalog_sync.refresh(db)
+            return result
+
+
+scheduler: Optional[IngestionScheduler] = None
+
+
+def start_scheduler() -> Optional[IngestionScheduler]:
+    global scheduler
+    if SCHEDULER_ENABLED and scheduler is None:
+        scheduler = IngestionScheduler()
+        scheduler.start()
+    return scheduler
+
+
+async def stop_scheduler():
+    global scheduler
+    if scheduler is not None:
+        await scheduler.stop()
+        scheduler = None
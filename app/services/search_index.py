@@ -0,0 +1,174 @@
+## in-process bm25 inverted index over job titles and companies, updated incrementally from the catalog
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from app.services.normalize import tokenize
+
+STOPWORDS = frozenset({'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'})
+# share of replaced documents after which postings are rebuilt without them
+COMPACT_RATIO = 0.25
+STORED_FIELDS = ('id', 'title', 'company', 'url', 'date', 'source')
+
+
+def date_key(value: Optional[str]) -> int:
+    """YYYY-MM-DD as an int (20240131) so date filters are integer comparisons."""
+    try:
+        return int(value[:10].replace('-', ''))
+    except (TypeError, ValueError):
+        return 0
+
+
+def term_counts(job: dict) -> Dict[str, int]:
+    terms: Dict[str, int] = {}
+    for token in tokenize(job.get('title') or '') + tokenize(job.get('company') or ''):
+        if token not in STOPWORDS:
+            terms[token] = terms.get(token, 0) + 1
+    return terms
+
+
+class JobSearchIndex:
+    """BM25-ranked keyword index with source, company and date filters.
+
+    Documents get consecutive internal numbers. Each term keeps its posting
+    list as two compact arrays (document numbers and term frequencies) that
+    only ever grow, so scoring is a handful of vectorized NumPy operations
+    over zero-copy views. Updating a job tombstones its old number and
+    appends it again; postings are compacted once enough of them are dead.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.clear()
+
+    def clear(self):
+        self.docs: List[Optional[dict]] = []
+        self.numbers: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.frequencies: Dict[str, array] = {}
+        # live documents per term; posting lists still hold tombstoned ones until compaction
+        self.document_frequency: Dict[str, int] = {}
+        self.lengths = array('I')
+        self.alive = bytearray()
+        self.dates = array('I')
+        self.sources = array('H')
+        self.companies = array('I')
+        self.source_codes: Dict[str, int] = {}
+        self.company_codes: Dict[str, int] = {}
+        self.total_length = 0
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def code(self, table: Dict[str, int], value: str) -> int:
+        return table.setdefault(value.lower(), len(table))
+
+    def add(self, job: dict):
+        """Adds a job, replacing any earlier version with the same id."""
+        stored = {field: job.get(field) for field in STORED_FIELDS}
+        previous = self.numbers.get(job['id'])
+        if previous is not None:
+            if self.docs[previous] == stored:
+                return
+            self.remove_number(previous)
+
+        terms = term_counts(job)
+        number = len(self.docs)
+        self.docs.append(stored)
+        self.numbers[job['id']] = number
+        length = sum(terms.values())
+        self.lengths.append(length)
+        self.total_length += length
+        self.alive.append(1)
+        self.dates.append(date_key(job.get('date')))
+        self.sources.append(self.code(self.source_codes, job.get('source') or ''))
+        self.companies.append(self.code(self.company_codes, job.get('company') or ''))
+        for term, count in terms.items():
+            if term not in self.postings:
+                self.postings[term] = array('I')
+                self.frequencies[term] = array('H')
+            self.postings[term].append(number)
+            self.frequencies[term].append(min(count, 0xFFFF))
+            self.document_frequency[term] = self.document_frequency.get(term, 0) + 1
+
+    def add_many(self, jobs: Iterable[dict]):
+        for job in jobs:
+            self.add(job)
+        if self.dead > COMPACT_RATIO * len(self.docs):
+            self.compact()
+
+    def remove_number(self, number: int):
+        self.alive[number] = 0
+        self.total_length -= self.lengths[number]
+        # the stored fields include title and company, so the terms can be recounted
+        for term in term_counts(self.docs[number]):
+            self.document_frequency[term] -= 1
+        self.dead += 1
+
+    def compact(self):
+        """Rebuilds the index from live documents, dropping tombstoned postings."""
+        live = [doc for doc, alive in zip(self.docs, self.alive) if alive]
+        self.clear()
+        for doc in live:
+            self.add(doc)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        source: Optional[str] = None,
+        company: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> dict:
+        """Returns the top `limit` jobs for the query with their BM25 scores."""
+        terms = {t for t in tokenize(query) if t not in STOPWORDS and self.document_frequency.get(t)}
+        live_count = len(self.numbers)
+        if not terms or not live_count:
+            return {'total': 0, 'jobs': []}
+
+        doc_count = len(self.docs)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.float32)
+        norms = self.k1 * (1 - self.b + self.b * lengths / (self.total_length / live_count or 1))
+        scores = np.zeros(doc_count, dtype=np.float32)
+        for term in terms:
+            docs = np.frombuffer(self.postings[term], dtype=np.uint32)
+            tf = np.frombuffer(self.frequencies[term], dtype=np.uint16).astype(np.float32)
+            df = self.document_frequency[term]
+            idf = math.log(1 + (live_count - df + 0.5) / (df + 0.5))
+            # a document appears at most once per posting list, so fancy-index += is safe
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norms[docs])
+
+        mask = (scores > 0) & np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        for value, codes, column, dtype in (
+            (source, self.source_codes, self.sources, np.uint16),
+            (company, self.company_codes, self.companies, np.uint32),
+        ):
+            if value is None:
+                continue
+            code = codes.get(value.lower())
+            if code is None:
+                return {'total': 0, 'jobs': []}
+            mask &= np.frombuffer(column, dtype=dtype) == code
+        if date_from or date_to:
+            dates = np.frombuffer(self.dates, dtype=np.uint32)
+            if date_from:
+                mask &= dates >= date_key(date_from)
+            if date_to:
+                mask &= dates <= date_key(date_to)
+
+        matches = np.flatnonzero(mask)
+        total = len(matches)
+        if total > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        # highest score first, newest first among equal scores
+        ranked = sorted(matches.tolist(), key=lambda n: (-scores[n], -self.dates[n]))
+        return {
+            'total': total,
+            'jobs': [{**self.docs[n], 'score': round(float(scores[n]), 4)} for n in ranked],
+        }
+
+
+search_index = JobSearchIndex()
@@ -0,0 +1,38 @@
+## persistent index of job ids already processed by ingestion, so repeat entries skip normalization
+from datetime import datetime
+from typing import Iterable, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+MARK_BATCH_SIZE = 1000
+
+
+class SeenJobIndex:
+    """Set of generate_id(url) values stored as _id in the seen_jobs collection.
+
+    Lookups only touch the ids in the current feed, so the cost of a check
+    grows with the size of the new data rather than with the catalog.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["seen_jobs"]
+
+    async def unseen(self, ids: Iterable[str]) -> Set[str]:
+        """Returns the subset of ids that have never been marked as seen."""
+        candidates = set(ids)
+        if not candidates:
+            return set()
+        cursor = self.collection.find({"_id": {"$in": list(candidates)}}, {"_id": 1})
+        async for doc in cursor:
+            candidates.discard(doc["_id"])
+        return candidates
+
+    async def mark_seen(self, ids: Iterable[str], source: str):
+        """Records ids as processed; existing entries keep their first_seen time."""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({"_id": job_id}, {"$setOnInsert": {"source": source, "first_seen": now}}, upsert=True)
+            for job_id in ids
+        ]
+        for start in range(0, len(operations), MARK_BATCH_SIZE):
+            await self.collection.bulk_write(operations[start:start + MARK_BATCH_SIZE], ordered=False)
@@ -0,0 +1,20 @@
+from typing import List
+from app.services.sources.base import SourceConnector
+from app.services.sources.linkedin import LinkedInConnector
+from app.services.sources.remoteok import RemoteOKConnector
+from app.services.sources.wwr import WWRConnector
+
+
+def default_connectors() -> List[SourceConnector]:
+    """Connectors for every source that is configured in this environment."""
+    connectors = [WWRConnector(), RemoteOKConnector(), LinkedInConnector()]
+    return [connector for connector in connectors if connector.enabled]
+
+
+__all__ = [
+    "SourceConnector",
+    "WWRConnector",
+    "RemoteOKConnector",
+    "LinkedInConnector",
+    "default_connectors",
+]
@@ -0,0 +1,128 @@
+## base class for job source connectors: fetch -> normalize -> filter -> emit
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Optional
+import httpx
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.services.jobs import FEED_TIMEOUT_SECONDS, FeedFetch, conditional_get, save_feed_state, save_to_mongodb
+from app.services.normalize import generate_id, is_engineering_job
+from app.services.seen_jobs import SeenJobIndex
+from app.utils.metrics import Counter, Histogram
+
+STAGE_SECONDS = Histogram(
+    "ingestion_stage_duration_seconds", "Time spent in each ingestion stage per source", labels=["source", "stage"]
+)
+# fetched -> already_seen | dropped (by normalize) | filtered | kept
+JOBS = Counter("ingestion_jobs", "Feed entries by what ingestion did with them", labels=["source", "outcome"])
+SAVED_JOBS = Counter("ingestion_saved_jobs", "Kept jobs by save result", labels=["source", "result"])
+RUNS = Counter("ingestion_runs", "Connector runs by result", labels=["source", "result"])
+
+
+class SourceConnector(ABC):
+    """A job source the ingestion pipeline can run on its own schedule.
+
+    Subclasses describe where the feed lives and how raw entries become a
+    batch of jobs; the base class handles conditional fetching, seen-index dedup,
+    filtering and saving.
+    """
+
+    name: str
+    url: str
+    # key holding the job URL in a raw entry, used to derive the job id before normalization
+    url_field: str = 'url'
+    default_interval_seconds: float = 3600
+
+    def __init__(self, interval_seconds: Optional[float] = None, timeout_seconds: Optional[float] = None):
+        env_prefix = f"INGEST_{self.key.upper()}"
+        self.interval_seconds = interval_seconds or float(
+            os.getenv(f"{env_prefix}_INTERVAL_SECONDS", self.default_interval_seconds)
+        )
+        self.timeout_seconds = timeout_seconds or float(
+            os.getenv(f"{env_prefix}_TIMEOUT_SECONDS", FEED_TIMEOUT_SECONDS)
+        )
+
+    @property
+    def key(self) -> str:
+        """Identifier used for environment overrides and scheduler locks."""
+        return ''.join(c if c.isalnum() else '_' for c in self.name.lower())
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    async def fetch(self, client: httpx.AsyncClient, db: AsyncIOMotorDatabase) -> Optional[FeedFetch]:
+        """Downloads the feed, returning None when it has not changed since the last run."""
+        return await conditional_get(client, db, self.name, self.url)
+
+    @abstractmethod
+    def parse(self, content: bytes) -> list:
+        """Decodes a downloaded feed into raw entries."""
+
+    @abstractmethod
+    def normalize(self, entries: List[Any]) -> List[dict]:
+        """Turns a batch of raw entries into job dicts, dropping any that should not be kept."""
+
+    def filter(self, job: dict) -> bool:
+        return is_engineering_job(job['title'])
+
+    async def emit(self, db: AsyncIOMotorDatabase, fetch: FeedFetch, jobs: list) -> dict:
+        """Saves jobs, then marks the fetch as processed if nothing failed."""
+        stats = await save_to_mongodb(jobs, db)
+        if not stats['failed']:
+            await SeenJobIndex(db).mark_seen(fetch.new_ids, self.name)
+            await save_feed_state(db, fetch)
+        return stats
+
+    async def unseen_entries(self, db: AsyncIOMotorDatabase, fetch: FeedFetch, entries: Iterable[Any]) -> list:
+        """Drops entries whose id is already in the seen index, before any normalization work."""
+        keyed = [(generate_id(entry[self.url_field]), entry) for entry in entries if entry.get(self.url_field)]
+        fetch.new_ids = await SeenJobIndex(db).unseen(job_id for job_id, _ in keyed)
+        return [entry for job_id, entry in keyed if job_id in fetch.new_ids]
+
+    def count(self, outcome: str, amount: int):
+        if amount:
+            JOBS.labels(self.name, outcome).inc(amount)
+
+    async def collect(self, client: httpx.AsyncClient, db: AsyncIOMotorDatabase):
+        with STAGE_SECONDS.labels(self.name, "fetch").time():
+            fetch = await self.fetch(client, db)
+        if fetch is None:
+            return None, []
+        with STAGE_SECONDS.labels(self.name, "parse").time():
+            raw_entries = self.parse(fetch.content)
+        with STAGE_SECONDS.labels(self.name, "dedup").time():
+            entries = await self.unseen_entries(db, fetch, raw_entries)
+        with STAGE_SECONDS.labels(self.name, "normalize").time():
+            normalized = self.normalize(entries)
+        with STAGE_SECONDS.labels(self.name, "filter").time():
+            jobs = [job for job in normalized if self.filter(job)]
+        self.count("fetched", len(raw_entries))
+        self.count("already_seen", len(raw_entries) - len(entries))
+        self.count("dropped", len(entries) - len(normalized))
+        self.count("filtered", len(normalized) - len(jobs))
+        self.count("kept", len(jobs))
+        return fetch, jobs
+
+    async def run(self, client: httpx.AsyncClient, db: AsyncIOMotorDatabase) -> dict:
+        """Runs one fetch -> normalize -> filter -> emit cycle and returns its stats.
+
+        Fetch and normalization are bounded by the connector timeout; errors
+        propagate so callers can back off.
+        """
+        try:
+            fetch, jobs = await asyncio.wait_for(self.collect(client, db), timeout=self.timeout_seconds)
+            if fetch is None:
+                print(f"{self.name} feed unchanged since last run")
+                RUNS.labels(self.name, "unchanged").inc()
+                return {'changed': False, 'new': 0, 'kept': 0}
+            with STAGE_SECONDS.labels(self.name, "save").time():
+                stats = await self.emit(db, fetch, jobs)
+        except Exception:
+            RUNS.labels(self.name, "failed").inc()
+            raise
+        for result in ('inserted', 'updated', 'unchanged', 'failed'):
+            if stats[result]:
+                SAVED_JOBS.labels(self.name, result).inc(stats[result])
+        RUNS.labels(self.name, "changed").inc()
+        return {'changed': True, 'new': len(fetch.new_ids), 'kept': len(jobs), **stats}
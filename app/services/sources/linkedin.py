@@ -0,0 +1,37 @@
+## linkedin connector over the rapidapi active jobs endpoint, enabled when RAPIDAPI_KEY is set
+import json
+import os
+from typing import List, Optional
+import httpx
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.services.job_scraper.linkedin_scraper import LinkedInJobScraper
+from app.services.jobs import FeedFetch, conditional_get
+from app.services.normalize import normalize_linkedin_entries
+from app.services.sources.base import SourceConnector
+
+
+class LinkedInConnector(SourceConnector):
+    name = 'LinkedIn'
+    # the API is metered, so poll it less often than the free feeds
+    default_interval_seconds = 6 * 3600
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scraper = LinkedInJobScraper()
+        self.url = f"{self.scraper.base_url}{self.scraper.endpoint}"
+        self.title_filter = os.getenv("LINKEDIN_TITLE_FILTER", "Software Engineer OR Developer")
+        self.limit = int(os.getenv("LINKEDIN_LIMIT", "100"))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(os.getenv('RAPIDAPI_KEY') and os.getenv('RAPIDAPI_HOST'))
+
+    async def fetch(self, client: httpx.AsyncClient, db: AsyncIOMotorDatabase) -> Optional[FeedFetch]:
+        params = self.scraper.build_params(title_filter=self.title_filter, remote=True, limit=self.limit)
+        return await conditional_get(client, db, self.name, self.url, params=params, headers=self.scraper.headers)
+
+    def parse(self, content: bytes) -> list:
+        return self.scraper.parse_job_data(json.loads(content))
+
+    def normalize(self, entries: List[dict]) -> List[dict]:
+        return normalize_linkedin_entries(entries, self.name)
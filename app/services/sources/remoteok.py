@@ -0,0 +1,20 @@
+## remote ok json api connector
+import json
+from typing import List
+from app.services.normalize import normalize_remoteok_entries
+from app.services.sources.base import SourceConnector
+
+MAX_AGE_DAYS = 7
+
+
+class RemoteOKConnector(SourceConnector):
+    name = 'Remote OK'
+    url = 'https://remoteok.com/api'
+    default_interval_seconds = 1800
+
+    def parse(self, content: bytes) -> list:
+        # the first element of the RemoteOK API response is a legal notice, not a job
+        return json.loads(content)[1:]
+
+    def normalize(self, entries: List[dict]) -> List[dict]:
+        return normalize_remoteok_entries(entries, self.name, MAX_AGE_DAYS)
@@ -0,0 +1,21 @@
+## we work remotely rss feed connector
+from typing import List
+from app.services.normalize import normalize_wwr_entries
+from app.services.sources.base import SourceConnector
+
+
+class WWRConnector(SourceConnector):
+    name = 'We Work Remotely'
+    url = 'https://weworkremotely.com/remote-jobs.rss'
+    url_field = 'link'
+    default_interval_seconds = 1800
+
+    def parse(self, content: bytes) -> list:
+        import feedparser  # imported on first fetch rather than with the app
+        feed = feedparser.parse(content)
+        if not feed.entries:
+            print("WWR feed empty or failed")
+        return feed.entries
+
+    def normalize(self, entries: list) -> List[dict]:
+        return normalize_wwr_entries(entries, self.name)
@@ -0,0 +1,34 @@
+## orjson-based json serialization used by every api response
+from decimal import Decimal
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi import responses
+
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def default(obj: Any) -> Any:
+    """Types orjson does not know natively; datetime, date and UUID are handled by orjson itself."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=default, option=DUMPS_OPTIONS)
+
+
+class JSONResponse(responses.JSONResponse):
+    """Default response class of the app.
+
+    Routes that return a JSONResponse directly skip FastAPI's
+    jsonable_encoder pass, so Mongo documents go straight to orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,231 @@
+## in-process counters, gauges and histograms rendered in the prometheus text format
+##
+## Metrics are per process: with several gunicorn workers, each one keeps
+## and serves its own values. Recording is meant to happen on the event
+## loop (no locks); values owned by other threads are read at scrape time
+## through callback metrics instead.
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# seconds; from a cache hit up to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """A named metric with a fixed set of label names; one child per label combination."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.children: Dict[LabelValues, object] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @abstractmethod
+    def new_child(self):
+        """A fresh child holding the series of one label combination."""
+
+    def labels(self, *values: str):
+        """The child for these label values, created on first use."""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            child = self.children[values] = self.new_child()
+        return child
+
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(suffix, formatted labels, value) for every series."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{suffix}{labels} {format_value(value)}" for suffix, labels, value in self.samples()]
+        return lines
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def new_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            yield "_total", format_labels(self.label_names, values), child.value
+
+
+class GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def new_child(self):
+        return GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            yield "", format_labels(self.label_names, values), child.value
+
+
+class Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: "HistogramChild"):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # one slot per bound plus the +Inf overflow
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> Timer:
+        """Context manager observing the seconds spent inside it."""
+        return Timer(self)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: Optional["Registry"] = None):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help, labels, registry)
+
+    def new_child(self):
+        return HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> Timer:
+        return self.labels().time()
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), list(child.counts)):
+                cumulative += count
+                yield "_bucket", format_labels(self.label_names + ("le",), values + (format_value(bound),)), cumulative
+            labels = format_labels(self.label_names, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Reads its series from a function at scrape time, for values owned elsewhere.
+
+    collect() returns {label values tuple: value}; errors drop the metric
+    from that scrape rather than failing it.
+    """
+
+    def __init__(self, name: str, help: str, collect: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = (),
+                 kind: str = "gauge", registry: Optional["Registry"] = None):
+        self.collect = collect
+        self.kind = kind
+        super().__init__(name, help, labels, registry)
+
+    def new_child(self):
+        raise TypeError(f"{self.name} is read at scrape time and has no children to record into")
+
+    def samples(self):
+        suffix = "_total" if self.kind == "counter" else ""
+        for values, value in self.collect().items():
+            yield suffix, format_labels(self.label_names, values), value
+
+    def render(self) -> List[str]:
+        try:
+            return super().render()
+        except Exception as e:
+            print(f"Metric {self.name} failed to collect: {e}")
+            return []
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,220 @@
+## sampling profiler: a background thread reads python stacks on an interval and folds them into collapsed stacks
+##
+## Output is one "frame;frame;frame count" line per distinct stack, the input
+## format of flamegraph.pl, speedscope and inferno. Nothing runs until a
+## profile is started, and each profile stops itself after its time box.
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from app.utils.ttl_cache import TTLCache
+
+MAX_PROFILE_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+DEFAULT_INTERVAL_SECONDS = 0.005
+# finished profiles kept for download by id
+STORED_PROFILES = TTLCache(int(os.getenv("PROFILE_STORE_SIZE", "32")), float(os.getenv("PROFILE_STORE_SECONDS", "3600")))
+WORKING_DIRECTORY = os.getcwd() + os.sep
+
+Stack = Tuple[str, ...]
+
+# at most one sampler at a time, so profiling can never pile up on a busy worker
+active_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+@lru_cache(maxsize=8192)
+def code_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(WORKING_DIRECTORY):
+        filename = filename[len(WORKING_DIRECTORY):]
+    else:
+        # site-packages and stdlib paths are long; the last two parts identify the module
+        filename = "/".join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def frame_stack(frame, root=None) -> Optional[Stack]:
+    """Labels of a thread's frames, outermost first; only those below root when one is given."""
+    labels = []
+    while frame is not None:
+        labels.append(code_label(frame.f_code))
+        if frame is root:
+            break
+        frame = frame.f_back
+    else:
+        if root is not None:
+            return None
+    return tuple(reversed(labels))
+
+
+def coroutine_stack(coro) -> Stack:
+    """Labels of a suspended coroutine chain, outermost first, ending with what it waits on."""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            labels.append(f"<{type(coro).__name__}>")
+            break
+        labels.append(code_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return tuple(labels)
+
+
+def collapse(counts: Counter) -> str:
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(counts.items()))
+
+
+class Sampler(ABC):
+    """Collects stacks from `sample()` every `interval` seconds on a daemon thread."""
+
+    # exclusive samplers hold active_lock; others only run inside a profile that does
+    exclusive = True
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, max_seconds: float = MAX_PROFILE_SECONDS):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts: Counter = Counter()
+        self.included: List[Tuple[Stack, Counter]] = []
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    @abstractmethod
+    def sample(self) -> Iterable[Stack]:
+        """The stacks seen at this instant; called from the sampling thread."""
+
+    def start(self):
+        if self.exclusive and not active_lock.acquire(blocking=False):
+            raise ProfilerBusy("Another profile is already running")
+        self.started = time.perf_counter()
+        self.thread.start()
+
+    def run(self):
+        try:
+            deadline = self.started + self.max_seconds
+            while not self.stopped.wait(self.interval) and time.perf_counter() < deadline:
+                for stack in self.sample():
+                    self.counts[stack] += 1
+                self.samples += 1
+        finally:
+            self.stopped.set()
+            if self.exclusive:
+                active_lock.release()
+
+    def include(self, counts: Counter, prefix: Stack):
+        """Adds stacks sampled elsewhere, e.g. in a pool process, under `prefix`; merged on stop."""
+        self.included.append((prefix, counts))
+
+    def stop(self) -> str:
+        """Stops sampling and returns the collapsed stacks."""
+        self.stopped.set()
+        self.thread.join()
+        for prefix, counts in self.included:
+            for stack, count in counts.items():
+                self.counts[prefix + stack] += count
+        self.included = []
+        return collapse(self.counts)
+
+
+class ProcessSampler(Sampler):
+    """Samples every thread of the process; each stack starts with the thread's name."""
+
+    def sample(self) -> Iterable[Stack]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident != own:
+                yield (names.get(ident, f"thread-{ident}"),) + frame_stack(frame)
+
+
+class TaskSampler(Sampler):
+    """Wall-clock samples of one asyncio task.
+
+    While the task runs, the sample is its part of the event loop thread's
+    stack; while it is suspended, it is the chain of awaits it is parked on,
+    so time spent waiting on MongoDB, Gemini or an executor shows up too.
+    """
+
+    def __init__(self, task: asyncio.Task, *args, **kwargs):
+        # must be created on the event loop thread
+        super().__init__(*args, **kwargs)
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread = threading.get_ident()
+
+    def sample(self) -> Iterable[Stack]:
+        if self.task.done():
+            return
+        coro = self.task.get_coro()
+        if asyncio.current_task(self.loop) is self.task:
+            frame = sys._current_frames().get(self.loop_thread)
+            stack = frame_stack(frame, root=coro.cr_frame)
+            # None when the task switched between the two reads; drop the sample
+            if stack is not None:
+                yield ("running",) + stack
+        else:
+            yield ("waiting",) + coroutine_stack(coro)
+
+
+class ThreadSampler(Sampler):
+    """Samples one thread; runs inside whatever profile is already active, or in a pool process."""
+
+    exclusive = False
+
+    def __init__(self, ident: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ident = ident
+
+    def sample(self) -> Iterable[Stack]:
+        frame = sys._current_frames().get(self.ident)
+        if frame is not None:
+            yield frame_stack(frame)
+
+
+def profile_call(interval: float, function: Callable, *args) -> Tuple[Any, Counter]:
+    """Runs function(*args) on this thread while sampling it; returns its result and the stack counts.
+
+    Module-level so it can be sent to a process pool: the samples come back
+    with the result and the caller adds them to its own profile.
+    """
+    sampler = ThreadSampler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        result = function(*args)
+    finally:
+        sampler.stop()
+    return result, sampler.counts
+
+
+async def profile_process(seconds: float, interval: float = DEFAULT_INTERVAL_SECONDS) -> str:
+    """Samples the whole process for `seconds` without blocking the event loop."""
+    sampler = ProcessSampler(interval, max_seconds=seconds)
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = sampler.stop()
+    return profile
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def store(profile: str, profile_id: Optional[str] = None) -> str:
+    profile_id = profile_id or new_profile_id()
+    STORED_PROFILES.set(profile_id, profile)
+    return profile_id
+
+
+def stored(profile_id: str) -> Optional[str]:
+    return STORED_PROFILES.get(profile_id)
@@ -0,0 +1,74 @@
+## runs the offline benchmark suite and writes one json report
+##
+##   python -m benchmarks [--quick] [--only micro,ingestion,load,startup] [--output report.json]
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from benchmarks import harness, bench_ingestion, bench_micro, bench_startup, load
+
+SUITES = ("micro", "ingestion", "load", "startup")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(name: str, quick: bool) -> dict:
+    if name == "micro":
+        return bench_micro.run(quick)
+    if name == "ingestion":
+        return asyncio.run(bench_ingestion.run(100 if quick else 500))
+    if name == "startup":
+        return bench_startup.run(3 if quick else 5)
+    return asyncio.run(load.run(
+        ["jobs", "jobs_search", "jobs_matches", "login", "resume_upload"],
+        requests=50 if quick else 200,
+        concurrency=10 if quick else 20,
+        users=10 if quick else 50,
+        jobs=1000 if quick else 5000,
+    ))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    arg_parser.add_argument("--quick", action="store_true", help="small inputs, for a smoke run")
+    arg_parser.add_argument("--only", default=",".join(SUITES), help="comma-separated subset of " + ", ".join(SUITES))
+    arg_parser.add_argument("--output", help="also write the report to this file")
+    args = arg_parser.parse_args()
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(names) - set(SUITES)
+    if unknown:
+        arg_parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "mongo": harness.mongo_mode(),
+            "quick": args.quick,
+        },
+    }
+    for name in names:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        report[name] = run_suite(name, args.quick)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+## ingestion end to end against fixture feeds: cold run, unchanged (304) run, and a run after new postings
+##
+##   python -m benchmarks.bench_ingestion [--entries 500]
+import argparse
+import asyncio
+import json
+import time
+from benchmarks import harness
+from benchmarks.fakes.feeds import FixtureFeeds
+from app.db import mongo
+from app.services import jobs
+
+
+async def timed_ingestion(feeds: FixtureFeeds) -> dict:
+    requests = feeds.requests
+    started = time.perf_counter()
+    with harness.quiet():
+        await jobs.run_ingestion()
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "feed_requests": feeds.requests - requests,
+        "jobs_stored": await mongo.get_database()["jobs"].count_documents({}),
+    }
+
+
+async def run(entries: int = 500) -> dict:
+    harness.install_fakes()
+    feeds = FixtureFeeds(entries)
+    create_http_client = jobs.create_http_client
+    jobs.create_http_client = feeds.client
+    mongo.connect()
+    try:
+        await harness.reset_database()
+        cold = await timed_ingestion(feeds)
+        unchanged = await timed_ingestion(feeds)
+        feeds.grow(max(1, entries // 10))
+        grown = await timed_ingestion(feeds)
+    finally:
+        jobs.create_http_client = create_http_client
+        mongo.close()
+    return {"entries": entries, "cold": cold, "unchanged": unchanged, "after_new_postings": grown}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Ingestion benchmark against fixture feeds")
+    arg_parser.add_argument("--entries", type=int, default=500, help="entries per feed")
+    args = arg_parser.parse_args()
+    print(json.dumps({"benchmark": "ingestion", "mongo": harness.mongo_mode(), **asyncio.run(run(args.entries))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
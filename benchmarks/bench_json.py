@@ -0,0 +1,75 @@
+## micro-benchmark: serializing a 10k-job payload with fastapi's default path vs app.utils.json_response
+##
+##   python -m benchmarks.bench_json [--jobs 10000] [--repeat 5]
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse as DefaultJSONResponse
+from pydantic import TypeAdapter
+from app.utils.json_response import JSONResponse
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Zürich Versicherung"]
+TITLES = ["Senior Software Engineer", "Backend Developer", "Staff SDE", "Frontend Dev", "Développeur Python"]
+
+
+def make_jobs(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    now = datetime(2024, 6, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": f"{rng.getrandbits(128):032x}",
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "url": f"https://example.com/jobs/{n}",
+            "date": (now - timedelta(days=rng.randint(0, 30))).strftime("%Y-%m-%d"),
+            "source": rng.choice(["Remote OK", "We Work Remotely", "LinkedIn"]),
+            "updated_at": now - timedelta(minutes=n),
+        }
+        for n in range(count)
+    ]
+
+
+def run(jobs: int = 10000, repeat: int = 5) -> dict:
+    payload = {"jobs": make_jobs(jobs), "next_cursor": None}
+    list_of_dicts = TypeAdapter(List[Dict])
+    encoders = {ObjectId: str}
+
+    cases = {
+        # what get_all_jobs did with its List[Dict] response model: validate, encode, json.dumps
+        "validated_default": lambda: DefaultJSONResponse(jsonable_encoder(
+            {"jobs": list_of_dicts.validate_python(payload["jobs"]), "next_cursor": None}, custom_encoder=encoders)).body,
+        # any route returning a dict: jsonable_encoder, then json.dumps
+        "default": lambda: DefaultJSONResponse(jsonable_encoder(payload, custom_encoder=encoders)).body,
+        # the app's response class, returned directly
+        "app_json_response": lambda: JSONResponse(payload).body,
+    }
+
+    # both paths must produce the same document
+    assert json.loads(cases["default"]()) == json.loads(cases["app_json_response"]())
+
+    results = {}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        results[name] = {"ms": round(best * 1000, 2), "bytes": len(case())}
+    baseline = results["default"]["ms"]
+    for result in results.values():
+        result["speedup_vs_default"] = round(baseline / result["ms"], 1)
+    return {"benchmark": "json", "jobs": jobs, "results": results}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="JSON serialization micro-benchmark")
+    arg_parser.add_argument("--jobs", type=int, default=10000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    print(json.dumps(run(args.jobs, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+## micro-benchmarks of the request-path hot spots: normalization, json, markdown, prompt compaction, search, matching
+##
+##   python -m benchmarks.bench_micro [--quick]
+import argparse
+import json
+import timeit
+from benchmarks import harness, fixtures, bench_json, bench_normalize
+from app.services.job_matcher import JobMatcher
+from app.services.prompt_compaction import compact_pages
+from app.services.search_index import JobSearchIndex
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    """Best per-call time in microseconds over `repeat` runs of `number` calls."""
+    return round(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6, 2)
+
+
+def run(quick: bool = False) -> dict:
+    harness.install_fakes()
+    from app.services.resume_parser import ResumeParser
+
+    repeat = 3 if quick else 5
+    catalog = fixtures.catalog_jobs(2000 if quick else 10000)
+    search_index = JobSearchIndex()
+    search_index.add_many(catalog)
+    job_matcher = JobMatcher()
+    job_matcher.add_many(catalog)
+
+    parser = ResumeParser()
+    resume = fixtures.resume("candidate@example.com")
+    pages = fixtures.resume_text(pages=10)
+
+    return {
+        "normalize": bench_normalize.run(1000 if quick else 5000, repeat)["results"],
+        "json": bench_json.run(2000 if quick else 10000, repeat)["results"],
+        "catalog_jobs": len(catalog),
+        "us_per_call": {
+            "convert_to_markdown": best_us(lambda: parser.convert_to_markdown(resume), 200, repeat),
+            "compact_pages_10_pages": best_us(lambda: compact_pages(pages, 3000), 20, repeat),
+            "search": best_us(lambda: search_index.search("senior python engineer", limit=20), 50, repeat),
+            "match": best_us(lambda: job_matcher.match(resume, k=20), 50, repeat),
+        },
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Request-path micro-benchmarks")
+    arg_parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer repeats")
+    args = arg_parser.parse_args()
+    print(json.dumps({"benchmark": "micro", **run(args.quick)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
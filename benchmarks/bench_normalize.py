@@ -0,0 +1,156 @@
+## micro-benchmark: per-entry normalization cost of the original helpers vs app.services.normalize
+##
+##   python -m benchmarks.bench_normalize [--entries 5000] [--repeat 5]
+import argparse
+import html
+import json
+import random
+import re
+import timeit
+from datetime import datetime, timedelta
+from dateutil import parser as date_parser
+from feedparser import FeedParserDict
+from app.services import normalize
+
+COMPANIES = ["Acme", "Globex &amp; Co", "Initech", "Umbrella (hiring)", "Hooli", "<b>Stark</b> Industries"]
+ROLES = ["Senior Software Engineer", "Backend Developer", "Sales Engineer", "Product Designer",
+         "DevOps Engineer", "Customer Success Manager", "Staff SDE", "Frontend Dev"]
+
+
+# --- the helpers as they were before the normalization module, kept verbatim for comparison ---
+
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return ' '.join(text.strip().split())
+
+
+def legacy_normalize_date(date_str):
+    try:
+        if not date_str:
+            return datetime.now().strftime('%Y-%m-%d')
+        return date_parser.parse(date_str, ignoretz=True).strftime('%Y-%m-%d')
+    except Exception:
+        return datetime.now().strftime('%Y-%m-%d')
+
+
+def legacy_is_engineering_job(title):
+    pattern = r'\b(?!sales\s)(engineer(ing)?|software|sde|developer|dev)\b'
+    return bool(re.search(pattern, title, re.IGNORECASE))
+
+
+def legacy_parse_wwr_title(title):
+    company = 'Unknown'
+    job_title = legacy_clean_text(title)
+    if ': ' in title:
+        parts = title.split(': ', 1)
+        company = legacy_clean_text(parts[0])
+        job_title = legacy_clean_text(parts[1])
+    elif ' at ' in title:
+        parts = title.split(' at ', 1)
+        job_title = legacy_clean_text(parts[0])
+        company = legacy_clean_text(parts[1])
+    company = re.sub(r'\s*\(?\s*hiring\s*\)?', '', company, flags=re.IGNORECASE).strip()
+    return company, job_title
+
+
+def legacy_wwr(entries):
+    jobs = []
+    for entry in entries:
+        company, title = legacy_parse_wwr_title(entry.title)
+        job = {'id': normalize.generate_id(entry.link), 'title': title, 'company': company,
+               'url': entry.link, 'date': legacy_normalize_date(entry.get('published', '')),
+               'source': 'We Work Remotely'}
+        if legacy_is_engineering_job(job['title']):
+            jobs.append(job)
+    return jobs
+
+
+def legacy_remoteok(entries):
+    jobs = []
+    for entry in entries:
+        job_date = legacy_normalize_date(entry.get('date', ''))
+        if (datetime.now() - date_parser.parse(job_date)).days > 7:
+            continue
+        job = {'id': normalize.generate_id(entry['url']), 'title': legacy_clean_text(entry.get('position', 'Untitled')),
+               'company': legacy_clean_text(entry.get('company', 'Unknown')), 'url': entry['url'],
+               'date': job_date, 'source': 'Remote OK'}
+        if legacy_is_engineering_job(job['title']):
+            jobs.append(job)
+    return jobs
+
+
+# --- current pipeline ---
+
+def fast_wwr(entries):
+    jobs = normalize.normalize_wwr_entries(entries, 'We Work Remotely')
+    return [job for job in jobs if normalize.is_engineering_job(job['title'])]
+
+
+def fast_remoteok(entries):
+    jobs = normalize.normalize_remoteok_entries(entries, 'Remote OK', 7)
+    return [job for job in jobs if normalize.is_engineering_job(job['title'])]
+
+
+def make_entries(count, seed=7):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    wwr, remoteok = [], []
+    for i in range(count):
+        # feeds post many jobs per day, so dates repeat at the granularity of a few hours
+        posted = now - timedelta(hours=rng.randint(0, 24 * 10))
+        posted = posted.replace(minute=0, second=0, microsecond=0)
+        company, role = rng.choice(COMPANIES), rng.choice(ROLES)
+        wwr.append(FeedParserDict(
+            title=f"{company}: {role}" if i % 3 else f"{role} at {company}",
+            link=f"https://weworkremotely.com/remote-jobs/{i}",
+            published=posted.strftime('%a, %d %b %Y %H:%M:%S +0000'),
+        ))
+        remoteok.append({
+            'url': f"https://remoteok.com/remote-jobs/{i}",
+            'position': role,
+            'company': company,
+            'date': posted.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        })
+    return wwr, remoteok
+
+
+def per_entry_us(fn, entries, repeat):
+    # best of `repeat` single runs; the first run of the fast path also pays for filling the date cache
+    timings = timeit.repeat(lambda: fn(entries), number=1, repeat=repeat)
+    return min(timings) / len(entries) * 1e6
+
+
+def run(entries: int = 5000, repeat: int = 5) -> dict:
+    wwr, remoteok = make_entries(entries)
+    assert legacy_wwr(wwr) == fast_wwr(wwr), "WWR output differs"
+    assert legacy_remoteok(remoteok) == fast_remoteok(remoteok), "Remote OK output differs"
+
+    results = {}
+    for name, legacy, fast, sample in (
+        ("wwr", legacy_wwr, fast_wwr, wwr),
+        ("remoteok", legacy_remoteok, fast_remoteok, remoteok),
+    ):
+        normalize.parse_date.cache_clear()
+        before = per_entry_us(legacy, sample, repeat)
+        after = per_entry_us(fast, sample, repeat)
+        results[name] = {
+            "before_us_per_entry": round(before, 2),
+            "after_us_per_entry": round(after, 2),
+            "speedup": round(before / after, 1),
+        }
+    return {"benchmark": "normalize", "entries": entries, "results": results}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Normalization micro-benchmark")
+    arg_parser.add_argument("--entries", type=int, default=5000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    print(json.dumps(run(args.entries, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+## benchmark: login latency during a signup storm, shared fifo threadpool vs the prioritized hashing pool
+##
+##   python -m benchmarks.bench_password_hashing [--signups 200] [--logins 50] [--rounds 10] [--workers 4]
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.services.password_hasher import HashPoolFull, PasswordHasher
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 1),
+        "p95_ms": round(pick(0.95) * 1000, 1),
+        "p99_ms": round(pick(0.99) * 1000, 1),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+    }
+
+
+async def storm(hash_password, verify_password, stored_hash, signups, logins, login_interval):
+    """Fires all signups at once, then one login every login_interval; returns login latencies."""
+    rejected = 0
+
+    async def signup(n):
+        nonlocal rejected
+        try:
+            await hash_password(f"password-{n}")
+        except HashPoolFull:
+            rejected += 1
+
+    async def login():
+        started = time.perf_counter()
+        try:
+            await verify_password("correct horse", stored_hash)
+        except HashPoolFull:
+            return None
+        return time.perf_counter() - started
+
+    signup_tasks = [asyncio.create_task(signup(n)) for n in range(signups)]
+    login_tasks = []
+    for _ in range(logins):
+        login_tasks.append(asyncio.create_task(login()))
+        await asyncio.sleep(login_interval)
+    latencies = [latency for latency in await asyncio.gather(*login_tasks) if latency is not None]
+    await asyncio.gather(*signup_tasks)
+    return latencies, rejected, logins - len(latencies)
+
+
+async def run(args):
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    stored_hash = context.hash("correct horse")
+    loop = asyncio.get_running_loop()
+    results = {}
+
+    # before: every hash shares one FIFO threadpool, as run_in_threadpool does
+    shared = ThreadPoolExecutor(max_workers=args.workers)
+    latencies, rejected, shed = await storm(
+        lambda password: loop.run_in_executor(shared, context.hash, password),
+        lambda password, hashed: loop.run_in_executor(shared, context.verify, password, hashed),
+        stored_hash, args.signups, args.logins, args.login_interval,
+    )
+    shared.shutdown()
+    results["shared_fifo_pool"] = {**percentiles(latencies), "signups_rejected": rejected, "logins_rejected": shed}
+
+    hasher = PasswordHasher(workers=args.workers, context=context)
+    latencies, rejected, shed = await storm(
+        hasher.hash, hasher.verify_and_update,
+        stored_hash, args.signups, args.logins, args.login_interval,
+    )
+    hasher.shutdown()
+    results["prioritized_pool"] = {**percentiles(latencies), "signups_rejected": rejected, "logins_rejected": shed}
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Password hashing pool benchmark")
+    arg_parser.add_argument("--signups", type=int, default=200)
+    arg_parser.add_argument("--logins", type=int, default=50)
+    arg_parser.add_argument("--login-interval", type=float, default=0.2)
+    arg_parser.add_argument("--rounds", type=int, default=10)
+    arg_parser.add_argument("--workers", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps({"benchmark": "password_hashing", **vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
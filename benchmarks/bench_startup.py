@@ -0,0 +1,101 @@
+## startup benchmark: cold import of app.main to the first served response, in fresh interpreters
+##
+##   python -m benchmarks.bench_startup [--runs 5] [--max-ms 2500]
+##
+## Exits 1 when the median exceeds --max-ms (or BENCH_STARTUP_MAX_MS), or when
+## a module that should load on first use was imported during startup.
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# must not be imported before a request needs them; see app.services.resume_parser,
+# pdf_text, sources.wwr, password_hasher and job_scraper.linkedin_scraper
+LAZY_MODULES = ("google.genai", "PyPDF2", "feedparser", "passlib", "requests", "markdownify")
+MAX_MS = float(os.getenv("BENCH_STARTUP_MAX_MS", "2500"))
+
+
+async def first_response(app) -> int:
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return (await client.get("/api/v1/health/live")).status_code
+
+
+def child():
+    """Runs in the fresh interpreter; nothing from app/ may be imported before this point."""
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+    eager = sorted(name for name in LAZY_MODULES if name in sys.modules)
+
+    # the fakes are installed outside the timed span
+    from benchmarks import harness
+    harness.install_fakes()
+
+    async def serve():
+        lifespan_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            status = await first_response(app)
+            responded = time.perf_counter()
+        return lifespan_started, ready, responded, status
+
+    lifespan_started, ready, responded, status = asyncio.run(serve())
+    print(json.dumps({
+        "import_ms": round((imported - started) * 1000, 1),
+        "lifespan_ms": round((ready - lifespan_started) * 1000, 1),
+        "first_response_ms": round((responded - ready) * 1000, 1),
+        "total_ms": round((imported - started + responded - lifespan_started) * 1000, 1),
+        "status": status,
+        "eager_modules": eager,
+    }))
+
+
+def run(runs: int = 5, max_ms: float = MAX_MS) -> dict:
+    # sets the offline environment the children inherit
+    from benchmarks import harness
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ("import_ms", "lifespan_ms", "first_response_ms", "total_ms")
+    }
+    eager = sorted({name for sample in samples for name in sample["eager_modules"]})
+    return {
+        "runs": runs,
+        "mongo": harness.mongo_mode(),
+        "median": summary,
+        "max_total_ms": max_ms,
+        "eager_modules": eager,
+        "passed": summary["total_ms"] <= max_ms and not eager and all(s["status"] == 200 for s in samples),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Cold start benchmark")
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--max-ms", type=float, default=MAX_MS, help="budget for the median import + first response")
+    arg_parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.child:
+        child()
+        return
+    result = run(args.runs, args.max_ms)
+    print(json.dumps({"benchmark": "startup", **result}, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
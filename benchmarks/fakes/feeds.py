@@ -0,0 +1,40 @@
+## fixture feeds served in place of We Work Remotely and Remote OK, with ETag support
+import hashlib
+import httpx
+from benchmarks import fixtures
+
+
+class FixtureFeeds:
+    """httpx transport answering the connector URLs from generated fixtures.
+
+    Bodies only change when `grow()` adds entries, so a second run gets 304s
+    the way the real feeds behave between publishes.
+    """
+
+    def __init__(self, entries: int = 500):
+        self.entries = entries
+        self.requests = 0
+        self.build()
+
+    def build(self):
+        self.bodies = {
+            "weworkremotely.com": fixtures.wwr_rss(self.entries),
+            "remoteok.com": fixtures.remoteok_json(self.entries),
+        }
+
+    def grow(self, entries: int):
+        self.entries += entries
+        self.build()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = self.bodies.get(request.url.host)
+        if body is None:
+            return httpx.Response(404)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, content=body, headers={"etag": etag})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
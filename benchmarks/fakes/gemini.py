@@ -0,0 +1,52 @@
+## stand-in for the google-genai client used by ResumeParser, with configurable latency
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+LATENCY_MS = float(os.getenv("FAKE_GEMINI_LATENCY_MS", "0"))
+
+
+def fake_response(contents) -> SimpleNamespace:
+    """A deterministic extraction in the fenced-JSON shape Gemini returns."""
+    prompt = contents[0] if contents else ""
+    words = [w for w in prompt.split() if w.isalpha()]
+    resume = {
+        "name": "Bench Candidate",
+        "contact": {"email": "candidate@example.com", "phone": "", "linkedin": ""},
+        "skills": sorted(set(words[-20:]))[:10] or ["python"],
+        "education": [{"degree": "BSc Computer Science", "institute": "Example University", "year": "2015"}],
+        "experience": [{"position": "Software Engineer", "company": "Acme", "description": " ".join(words[:30]), "duration": "3 years"}],
+        "projects": [],
+        "certifications": [],
+        "preferences": {"location": "remote", "role": "backend engineer"},
+    }
+    return SimpleNamespace(text="```json\n" + json.dumps(resume) + "\n```")
+
+
+class FakeModels:
+    def generate_content(self, model, contents):
+        time.sleep(LATENCY_MS / 1000)
+        return fake_response(contents)
+
+
+class FakeAsyncModels:
+    async def generate_content(self, model, contents):
+        await asyncio.sleep(LATENCY_MS / 1000)
+        return fake_response(contents)
+
+
+class Client:
+    """Drop-in for google.genai.Client."""
+
+    def __init__(self, api_key=None, **kwargs):
+        self.models = FakeModels()
+        self.aio = SimpleNamespace(models=FakeAsyncModels())
+
+
+def install():
+    """Makes ResumeParser build the fake client; call before the app starts."""
+    from app.services import resume_parser
+
+    resume_parser.create_genai_client = lambda api_key: Client(api_key=api_key)
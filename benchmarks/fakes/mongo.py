@@ -0,0 +1,37 @@
+## in-process stand-in for mongod, built on mongomock-motor (see benchmarks/requirements.txt)
+##
+## Only for benchmarks that must run without a database server: numbers
+## measure the app's own overhead, not MongoDB's. Set BENCH_MONGODB_URI to
+## benchmark against a real mongod instead.
+from mongomock_motor import AsyncMongoMockClient, AsyncMongoMockCollection
+from pymongo.results import BulkWriteResult
+
+
+async def bulk_write(self, requests, ordered=True, **kwargs):
+    """bulk_write replayed as single operations; mongomock's own cannot read newer pymongo request objects."""
+    counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "nRemoved": 0, "upserted": []}
+    for request in requests:
+        kind = type(request).__name__
+        if kind == "InsertOne":
+            await self.insert_one(request._doc)
+            counts["nInserted"] += 1
+        elif kind in ("UpdateOne", "ReplaceOne"):
+            method = self.update_one if kind == "UpdateOne" else self.replace_one
+            result = await method(request._filter, request._doc, upsert=request._upsert)
+            counts["nMatched"] += result.matched_count
+            counts["nModified"] += result.modified_count
+            if result.upserted_id is not None:
+                counts["nUpserted"] += 1
+        elif kind == "DeleteOne":
+            counts["nRemoved"] += (await self.delete_one(request._filter)).deleted_count
+        else:
+            raise NotImplementedError(f"{kind} is not supported by the in-process stand-in")
+    return BulkWriteResult(counts, True)
+
+
+def install():
+    """Points app.db.mongo at an in-process client; call before the app connects."""
+    from app.db import mongo
+
+    AsyncMongoMockCollection.bulk_write = bulk_write
+    mongo.AsyncIOMotorClient = lambda uri, **options: AsyncMongoMockClient()
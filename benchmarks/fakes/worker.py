@@ -0,0 +1,38 @@
+## stand-in for the embedding worker service, for local runs and benchmarks
+##
+##   FAKE_WORKER_LATENCY_MS=200 FAKE_WORKER_FAILURE_RATE=0.1 \
+##       uvicorn benchmarks.fakes.worker:app --port 8001
+##   WORKER_URL=http://localhost:8001 uvicorn app.main:app
+import asyncio
+import os
+import random
+import uuid
+from collections import Counter
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+LATENCY_MS = float(os.getenv("FAKE_WORKER_LATENCY_MS", "50"))
+FAILURE_RATE = float(os.getenv("FAKE_WORKER_FAILURE_RATE", "0"))
+
+app = FastAPI(title="Fake embedding worker")
+requests_by_email: Counter = Counter()
+
+
+class EmbeddingRequest(BaseModel):
+    email: str
+    sections: Optional[List[str]] = None
+
+
+@app.post("/precompute-embedding")
+async def precompute_embedding(request: EmbeddingRequest):
+    await asyncio.sleep(LATENCY_MS / 1000)
+    if random.random() < FAILURE_RATE:
+        raise HTTPException(status_code=503, detail="worker overloaded")
+    requests_by_email[request.email] += 1
+    return {"task_id": uuid.uuid4().hex, "status": "queued"}
+
+
+@app.get("/stats")
+async def stats():
+    return {"requests": sum(requests_by_email.values()), "by_email": dict(requests_by_email)}
@@ -0,0 +1,138 @@
+## deterministic fixture data for the benchmarks: feeds, catalog jobs, resumes and pdfs
+import json
+import random
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from typing import List
+from xml.sax.saxutils import escape
+from app.services.normalize import generate_id
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Soylent"]
+TITLES = [
+    "Senior Software Engineer", "Backend Developer", "Staff SDE", "Frontend Dev", "Python Engineer",
+    "DevOps Engineer", "Data Engineer", "Sales Manager", "Product Designer", "Customer Success Lead",
+]
+SKILLS = ["python", "go", "react", "kubernetes", "postgres", "mongodb", "aws", "fastapi", "typescript", "rust"]
+
+
+def wwr_rss(entries: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    items = []
+    for n in range(entries):
+        published = format_datetime(now - timedelta(hours=rng.randint(0, 24 * 20)))
+        title = escape(f"{rng.choice(COMPANIES)}: {rng.choice(TITLES)}")
+        items.append(
+            f"<item><title>{title}</title><link>https://weworkremotely.com/jobs/{n}</link>"
+            f"<pubDate>{published}</pubDate><description>Remote role {n}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>We Work Remotely</title>" + "".join(items) + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def remoteok_json(entries: int, seed: int = 2) -> bytes:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    jobs = [{"legal": "API terms of service"}]
+    for n in range(entries):
+        jobs.append({
+            "id": str(n),
+            "url": f"https://remoteok.com/remote-jobs/{n}",
+            "position": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "date": (now - timedelta(hours=rng.randint(0, 24 * 10))).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "tags": rng.sample(SKILLS, 3),
+        })
+    return json.dumps(jobs).encode("utf-8")
+
+
+def catalog_jobs(count: int, seed: int = 3) -> List[dict]:
+    """Normalized jobs as ingestion stores them."""
+    rng = random.Random(seed)
+    today = datetime.utcnow()
+    jobs = []
+    for n in range(count):
+        url = f"https://example.com/jobs/{n}"
+        jobs.append({
+            "id": generate_id(url),
+            "title": f"{rng.choice(TITLES)} ({rng.choice(SKILLS)})",
+            "company": rng.choice(COMPANIES),
+            "url": url,
+            "date": (today - timedelta(days=rng.randint(0, 30))).strftime("%Y-%m-%d"),
+            "source": rng.choice(["We Work Remotely", "Remote OK"]),
+        })
+    return jobs
+
+
+def resume(email: str, seed: int = 4) -> dict:
+    """A parsed resume in the shape ResumeParser stores."""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 5)
+    return {
+        "user_email": email,
+        "name": "Bench Candidate",
+        "contact": {"email": email, "phone": "+1 555 0100", "linkedin": "linkedin.com/in/bench"},
+        "skills": skills,
+        "education": [{"degree": "BSc Computer Science", "institute": "Example University", "year": "2015"}],
+        "experience": [
+            {"position": rng.choice(TITLES), "company": rng.choice(COMPANIES),
+             "description": f"Built services with {', '.join(skills)}", "duration": f"{n + 1} years"}
+            for n in range(3)
+        ],
+        "projects": [{"title": "Job board", "tech_stack": skills[:2], "description": "Search and matching"}],
+        "certifications": [{"name": "AWS Solutions Architect"}],
+        "preferences": {"location": "remote", "role": "backend engineer"},
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def resume_text(seed: int = 5, pages: int = 2) -> List[str]:
+    """Page texts of a resume PDF, with the repeated headers and footers real exports have."""
+    rng = random.Random(seed)
+    header = "Bench Candidate | candidate@example.com | +1 555 0100"
+    body = [
+        "Summary", "Backend engineer focused on APIs and data pipelines.",
+        "Experience", *[f"- Built {rng.choice(SKILLS)} service number {n} handling {rng.randint(1, 90)}k rpm" for n in range(40)],
+        "Skills", ", ".join(SKILLS),
+        "Education", "BSc Computer Science, Example University, 2015",
+        "Projects", *[f"Project {n}: {rng.choice(SKILLS)} tooling" for n in range(20)],
+    ]
+    per_page = -(-len(body) // pages)
+    return [
+        "\n".join([header, *body[p * per_page:(p + 1) * per_page], f"Page {p + 1} of {pages}"])
+        for p in range(pages)
+    ]
+
+
+def pdf(pages: List[str]) -> bytes:
+    """A minimal valid PDF with one Helvetica text block per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * n} 0 R" for n in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font = 3 + 2 * len(pages)
+    for n, text in enumerate(pages):
+        lines = [
+            line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            for line in text.splitlines()
+        ]
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {4 + 2 * n} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
@@ -0,0 +1,111 @@
+## offline environment for the benchmarks: fake gemini, fake worker, fixture feeds and a mongo stand-in
+##
+## Import this module before anything under app/: it sets the environment the
+## app reads at import time. With BENCH_MONGODB_URI set, benchmarks run
+## against that mongod (database jobgenie_bench, dropped before each run);
+## otherwise against the in-process stand-in.
+import contextlib
+import io
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+import httpx
+
+BENCH_MONGODB_URI = os.getenv("BENCH_MONGODB_URI")
+BENCH_DATABASE = "jobgenie_bench"
+FAKE_WORKER_URL = "http://fake-worker"
+BENCH_PASSWORD = "bench-password"
+
+os.environ.setdefault("GOOGLE_API_KEY", "bench")
+os.environ.setdefault("WORKER_URL", FAKE_WORKER_URL)
+os.environ["MONGODB_DB"] = BENCH_DATABASE
+# the scheduler and catalog sync would race the benchmark's own ingestion runs
+os.environ["INGESTION_SCHEDULER_ENABLED"] = "false"
+os.environ.setdefault("CATALOG_SYNC_INTERVAL_SECONDS", "3600")
+# cheaper than production's 12 so login runs finish quickly; override to measure the real cost
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+for key in ("RAPIDAPI_KEY", "RAPIDAPI_HOST"):
+    os.environ.pop(key, None)
+if BENCH_MONGODB_URI:
+    os.environ["MONGODB_URI"] = BENCH_MONGODB_URI
+
+from app.db import mongo  # noqa: E402  (environment must be set first)
+from benchmarks import fixtures  # noqa: E402
+from benchmarks.fakes import gemini, worker  # noqa: E402
+
+installed = False
+
+
+def mongo_mode() -> str:
+    return "mongod" if BENCH_MONGODB_URI else "in-process"
+
+
+def install_fakes():
+    """Swaps external services for local fakes; safe to call more than once."""
+    global installed
+    if installed:
+        return
+    if not BENCH_MONGODB_URI:
+        from benchmarks.fakes import mongo as mongo_stand_in
+        mongo_stand_in.install()
+    gemini.install()
+
+    from app.services import embedder_dispatcher
+
+    class FakeWorkerDispatcher(embedder_dispatcher.EmbedderDispatcher):
+        def __init__(self):
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=worker.app), base_url=FAKE_WORKER_URL)
+            super().__init__(FAKE_WORKER_URL, client)
+            self.owns_client = True
+
+    if os.environ["WORKER_URL"] == FAKE_WORKER_URL:
+        embedder_dispatcher.EmbedderDispatcher = FakeWorkerDispatcher
+    installed = True
+
+
+async def reset_database():
+    await mongo.get_client().drop_database(BENCH_DATABASE)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences the app's progress prints while a benchmark is timed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+async def seed(jobs: int = 5000, users: int = 50, resumes: int = 50):
+    """Fills the bench database through the app's own write paths and warms the in-process indexes."""
+    from app.services import jobs as jobs_service
+    from app.services.catalog_sync import catalog_sync
+    from app.services.password_hasher import get_pwd_context
+
+    db = mongo.get_database()
+    with quiet():
+        await jobs_service.save_to_mongodb(fixtures.catalog_jobs(jobs), db)
+    password = get_pwd_context().hash(BENCH_PASSWORD)
+    if users:
+        await db["users"].insert_many([
+            {"name": f"Bench {n}", "email": user_email(n), "password": password} for n in range(users)
+        ])
+    if resumes:
+        await db["resumes"].insert_many([fixtures.resume(user_email(n), seed=n) for n in range(resumes)])
+    await catalog_sync.refresh(db)
+
+
+def user_email(n: int) -> str:
+    return f"bench-{n}@example.com"
+
+
+@asynccontextmanager
+async def running_app(**seed_sizes) -> AsyncIterator[Tuple[object, httpx.AsyncClient]]:
+    """Starts the app with its lifespan on a fresh, seeded bench database and yields (app, client)."""
+    install_fakes()
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        await reset_database()
+        await seed(**seed_sizes)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield app, client
@@ -0,0 +1,139 @@
+## http load driver: fixed number of requests per endpoint at a given concurrency, latency percentiles as json
+##
+##   python -m benchmarks.load [--base-url http://localhost:8000] [--concurrency 20] [--requests 200]
+##                             [--endpoints jobs,jobs_search,jobs_matches,login,resume_upload]
+##
+## Without --base-url the app runs in-process on the offline harness (see
+## benchmarks/harness.py). With it, the target must already hold data; bench
+## users are signed up through the API first.
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+import httpx
+from benchmarks import harness, fixtures
+
+API = "/api/v1"
+SEARCH_TERMS = ["python", "senior engineer", "backend developer", "react", "devops kubernetes", "data"]
+
+
+def endpoints(users: int) -> Dict[str, Callable[[int], dict]]:
+    """Request builders by endpoint name; each takes the request number."""
+    uploads = [fixtures.pdf(fixtures.resume_text(seed=n)) for n in range(8)]
+    return {
+        "jobs": lambda n: {"method": "GET", "url": f"{API}/jobs", "params": {"limit": 50},
+                           "headers": {"accept-encoding": "gzip"}},
+        "jobs_search": lambda n: {"method": "GET", "url": f"{API}/jobs/search",
+                                  "params": {"q": SEARCH_TERMS[n % len(SEARCH_TERMS)]}},
+        "jobs_matches": lambda n: {"method": "GET", "url": f"{API}/jobs/matches",
+                                   "params": {"user_email": harness.user_email(n % users)}},
+        "login": lambda n: {"method": "POST", "url": f"{API}/login",
+                            "json": {"email": harness.user_email(n % users), "password": harness.BENCH_PASSWORD}},
+        "resume_upload": lambda n: {"method": "POST", "url": f"{API}/resume/upload",
+                                    "files": {"file": ("resume.pdf", uploads[n % len(uploads)], "application/pdf")},
+                                    "data": {"user_email": harness.user_email(n % users)}},
+    }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def drive(client: httpx.AsyncClient, build: Callable[[int], dict], requests: int, concurrency: int) -> dict:
+    """Sends `requests` requests from `concurrency` concurrent callers."""
+    numbers = itertools.count()
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+
+    async def caller():
+        for n in numbers:
+            if n >= requests:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.request(**build(n))
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    latency_ms = {name: round(percentile(latencies, q) * 1000, 2) for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+    latency_ms["max"] = round(latencies[-1] * 1000, 2) if latencies else 0.0
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": latency_ms,
+        "status": dict(statuses),
+        "errors": dict(errors),
+    }
+
+
+async def run_against(client: httpx.AsyncClient, names: List[str], requests: int, concurrency: int, users: int) -> dict:
+    builders = endpoints(users)
+    results = {}
+    for name in names:
+        # a few untimed requests so first-call costs (page cache, lazy imports) are not in the numbers
+        await drive(client, builders[name], min(concurrency, requests), concurrency)
+        results[name] = await drive(client, builders[name], requests, concurrency)
+    return results
+
+
+async def sign_up_users(client: httpx.AsyncClient, users: int):
+    for n in range(users):
+        await client.post(f"{API}/signup", json={
+            "name": f"Bench {n}", "email": harness.user_email(n), "password": harness.BENCH_PASSWORD,
+        })
+
+
+async def run(
+    names: List[str],
+    requests: int = 200,
+    concurrency: int = 20,
+    users: int = 50,
+    jobs: int = 5000,
+    base_url: Optional[str] = None,
+) -> dict:
+    unknown = set(names) - set(endpoints(1))
+    if unknown:
+        raise ValueError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    if base_url:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            await sign_up_users(client, users)
+            results = await run_against(client, names, requests, concurrency, users)
+        return {"target": base_url, "results": results}
+
+    async with harness.running_app(jobs=jobs, users=users, resumes=users) as (_, client):
+        with harness.quiet():
+            results = await run_against(client, names, requests, concurrency, users)
+    return {"target": "in-process", "mongo": harness.mongo_mode(), "catalog_jobs": jobs, "results": results}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="HTTP load driver")
+    arg_parser.add_argument("--base-url", help="running server to load; default runs the app in-process")
+    arg_parser.add_argument("--concurrency", type=int, default=20)
+    arg_parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    arg_parser.add_argument("--endpoints", default="jobs,jobs_search,jobs_matches,login,resume_upload")
+    arg_parser.add_argument("--users", type=int, default=50)
+    arg_parser.add_argument("--jobs", type=int, default=5000, help="catalog size seeded in-process")
+    args = arg_parser.parse_args()
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    result = asyncio.run(run(names, args.requests, args.concurrency, args.users, args.jobs, args.base_url))
+    print(json.dumps({"benchmark": "load", **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+## shared fixtures: the app's environment is set before anything under app/ is imported
+import os
+
+os.environ["MONGODB_DB"] = "jobgenie_test"
+os.environ["GOOGLE_API_KEY"] = "test"
+os.environ["INGESTION_SCHEDULER_ENABLED"] = "false"
+os.environ["FAKE_WORKER_LATENCY_MS"] = "0"
+os.environ["EMBEDDER_COALESCE_SECONDS"] = "0"
+for key in ("RAPIDAPI_KEY", "RAPIDAPI_HOST", "WORKER_URL"):
+    os.environ.pop(key, None)
+
+import httpx  # noqa: E402  (environment must be set first)
+import pytest  # noqa: E402
+from app.db import mongo  # noqa: E402
+from benchmarks.fakes import mongo as mongo_stand_in  # noqa: E402
+from benchmarks.fakes import worker  # noqa: E402
+
+mongo_stand_in.install()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A fresh, empty database on the in-process stand-in."""
+    mongo.close()
+    mongo.connect()
+    await mongo.get_client().drop_database(mongo.MONGODB_DB)
+    yield mongo.get_database()
+    mongo.close()
+
+
+@pytest.fixture
+async def worker_client(monkeypatch):
+    """An HTTP client wired to the fake embedding worker, with its request counts reset."""
+    worker.requests_by_email.clear()
+    monkeypatch.setattr(worker, "FAILURE_RATE", 0)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=worker.app), base_url="http://fake-worker") as client:
+        yield client
@@ -0,0 +1,39 @@
+import pytest
+from app.services import auth
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "ann@example.com"
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    auth.user_cache.clear()
+    yield
+    auth.user_cache.clear()
+
+
+async def test_get_user_leaves_out_the_password(db):
+    await db["users"].insert_one({"name": "Ann", "email": EMAIL, "password": "hash"})
+
+    user = await auth.get_user(db, EMAIL)
+
+    assert user["name"] == "Ann"
+    assert "password" not in user
+
+
+async def test_changing_a_returned_user_does_not_change_the_cache(db):
+    await db["users"].insert_one({"name": "Ann", "email": EMAIL, "password": "hash"})
+
+    user = await auth.get_user(db, EMAIL)
+    user["name"] = "Changed"
+    user["is_admin"] = True
+    cached = await auth.get_user(db, EMAIL)
+
+    assert cached["name"] == "Ann"
+    assert "is_admin" not in cached
+    assert cached is not user
+
+
+async def test_unknown_user_is_none(db):
+    assert await auth.get_user(db, "nobody@example.com") is None
@@ -0,0 +1,38 @@
+from datetime import datetime
+import httpx
+import pytest
+from app.main import app
+from app.services.catalog_sync import catalog_sync
+from app.services.job_matcher import job_matcher
+from app.services.search_index import search_index
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def empty_catalog():
+    catalog_sync.watermark = None
+    search_index.clear()
+    job_matcher.clear()
+    yield
+    catalog_sync.watermark = None
+    search_index.clear()
+    job_matcher.clear()
+
+
+async def test_catalog_is_loaded_before_the_app_serves(db, empty_catalog):
+    await db["jobs"].insert_one({
+        "id": "job-1", "title": "Senior Python Developer", "company": "Acme", "url": "https://example.com/1",
+        "date": "2024-05-01", "source": "Remote OK", "updated_at": datetime.utcnow(),
+    })
+
+    async with app.router.lifespan_context(app):
+        assert catalog_sync.loaded
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            search = (await client.get("/api/v1/jobs/search", params={"q": "python"})).json()
+            ready = (await client.get("/api/v1/health/ready")).json()
+
+    assert search["total"] == 1
+    assert search["jobs"][0]["id"] == "job-1"
+    assert len(job_matcher) == 1
+    assert ready["catalog_loaded"] is True
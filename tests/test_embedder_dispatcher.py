@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.services import embedder_dispatcher
+from app.services.embedder_dispatcher import FAILED, PENDING, EmbedderDispatcher, enqueue_embedding, outbox_collection
+from benchmarks.fakes import worker
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "ann@example.com"
+
+
+@pytest.fixture
+def dispatcher(worker_client):
+    return EmbedderDispatcher(worker_url(worker_client), worker_client)
+
+
+def worker_url(client) -> str:
+    return str(client.base_url).rstrip("/")
+
+
+async def make_due(db):
+    await outbox_collection(db).update_many({}, {"$set": {"available_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+
+async def test_requests_inside_the_window_are_sent_once(db, dispatcher, monkeypatch):
+    monkeypatch.setattr(embedder_dispatcher, "COALESCE_WINDOW_SECONDS", 60)
+    resume_id = str(ObjectId())
+    await enqueue_embedding(EMAIL, str(ObjectId()), ["skills"], db)
+    await enqueue_embedding(EMAIL, resume_id, ["skills", "experience"], db)
+
+    assert await dispatcher.dispatch_batch() == 0
+    await make_due(db)
+    assert await dispatcher.dispatch_batch() == 1
+
+    assert worker.requests_by_email == {EMAIL: 1}
+    assert await outbox_collection(db).count_documents({}) == 0
+
+
+async def test_sent_request_records_task_id_on_resume(db, dispatcher):
+    resume_id = (await db.resumes.insert_one({"user_email": EMAIL})).inserted_id
+    await enqueue_embedding(EMAIL, str(resume_id), ["skills", "projects"], db)
+
+    assert await dispatcher.dispatch_batch() == 1
+
+    resume = await db.resumes.find_one({"_id": resume_id})
+    assert len(resume["embedding_task_id"]) == 32
+    assert sorted(resume["embedding_sections"]) == ["projects", "skills"]
+    assert isinstance(resume["embedding_requested_at"], datetime)
+
+
+async def test_request_bumped_while_in_flight_is_requeued(db, dispatcher):
+    await enqueue_embedding(EMAIL, str(ObjectId()), ["skills"], db)
+    [request] = await dispatcher.claim()
+    await enqueue_embedding(EMAIL, str(ObjectId()), ["education"], db)
+
+    await dispatcher.dispatch(request)
+
+    requeued = await outbox_collection(db).find_one({"_id": EMAIL})
+    assert requeued["status"] == PENDING
+    assert requeued["attempts"] == 0
+    assert "claim" not in requeued and "lease_until" not in requeued
+    assert await dispatcher.dispatch_batch() == 1
+    assert worker.requests_by_email == {EMAIL: 2}
+    assert await outbox_collection(db).count_documents({}) == 0
+
+
+async def test_failed_sends_back_off_then_give_up(db, dispatcher, monkeypatch):
+    monkeypatch.setattr(worker, "FAILURE_RATE", 1)
+    monkeypatch.setattr(embedder_dispatcher, "BACKOFF_BASE_SECONDS", 10)
+    monkeypatch.setattr(embedder_dispatcher, "MAX_ATTEMPTS", 3)
+    await enqueue_embedding(EMAIL, str(ObjectId()), ["skills"], db)
+
+    for attempts, delay in ((1, 10), (2, 20)):
+        started = datetime.utcnow()
+        assert await dispatcher.dispatch_batch() == 1
+        request = await outbox_collection(db).find_one({"_id": EMAIL})
+        assert request["status"] == PENDING
+        assert request["attempts"] == attempts
+        assert request["error"] == "worker returned 503"
+        waited = (request["available_at"] - started).total_seconds()
+        assert delay - 1 < waited <= delay + 1
+        # not due again until the backoff has passed
+        assert await dispatcher.dispatch_batch() == 0
+        await make_due(db)
+
+    assert await dispatcher.dispatch_batch() == 1
+    request = await outbox_collection(db).find_one({"_id": EMAIL})
+    assert request["status"] == FAILED
+    assert request["attempts"] == 3
+    assert worker.requests_by_email == {}
+
+
+async def test_client_errors_are_not_retried(db, worker_client):
+    dispatcher = EmbedderDispatcher(worker_url(worker_client) + "/missing", worker_client)
+    await enqueue_embedding(EMAIL, str(ObjectId()), ["skills"], db)
+
+    assert await dispatcher.dispatch_batch() == 1
+
+    request = await outbox_collection(db).find_one({"_id": EMAIL})
+    assert request["status"] == FAILED
+    assert request["error"] == "worker returned 404"
@@ -0,0 +1,151 @@
+import gzip
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.api.v1.fetch_jobs import CachedPage, choose_encoding, decode_cursor, encode_cursor, etag_matches, page_cache
+from app.main import app
+from app.services.catalog_version import catalog_version
+from app.services.jobs import save_to_mongodb
+
+pytestmark = pytest.mark.anyio
+
+# three jobs share 2024-05-02, so the id breaks the tie
+DATES = ["2024-05-03", "2024-05-02", "2024-05-02", "2024-05-02", "2024-05-01", "2024-04-30", "2024-04-29"]
+
+
+def job(n: int, date: str) -> dict:
+    return {
+        "id": f"job-{n:02d}", "title": f"Engineer {n}", "company": "Acme",
+        "url": f"https://example.com/{n}", "date": date, "source": "Remote OK",
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_page_cache():
+    page_cache.clear()
+    catalog_version.value = None
+    yield
+    page_cache.clear()
+    catalog_version.value = None
+
+
+@pytest.fixture
+async def client(db):
+    await db["jobs"].insert_many([job(n, date) for n, date in enumerate(DATES)])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def all_pages(client, limit: int, between_pages=None) -> list:
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/v1/jobs", params=params)).json()
+        ids += [j["id"] for j in page["jobs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+        if between_pages is not None:
+            await between_pages()
+
+
+def test_cursor_round_trips():
+    cursor = encode_cursor({"date": "2024-05-02", "id": "job/é+1"})
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-02", "job/é+1")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor({"date": 20240502, "id": "x"}), "W10"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+async def test_pages_cover_every_job_once_in_order(client):
+    jobs = sorted((job(n, date) for n, date in enumerate(DATES)), key=lambda j: (j["date"], j["id"]), reverse=True)
+    expected = [j["id"] for j in jobs]
+
+    for limit in (1, 2, 3, 50):
+        assert await all_pages(client, limit) == expected
+
+
+async def test_jobs_inserted_while_paging_do_not_shift_later_pages(client, db):
+    expected = await all_pages(client, 2)
+    inserted = iter(range(100, 110))
+
+    async def insert_newer_job():
+        await db["jobs"].insert_one(job(next(inserted), "2024-06-01"))
+
+    assert await all_pages(client, 2, between_pages=insert_newer_job) == expected
+
+
+async def test_invalid_cursor_is_a_400(client):
+    response = await client.get("/api/v1/jobs", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+
+
+async def test_unchanged_page_is_a_304(client):
+    first = await client.get("/api/v1/jobs")
+    etag = first.headers["etag"]
+
+    again = await client.get("/api/v1/jobs", headers={"If-None-Match": etag})
+    other = await client.get("/api/v1/jobs", headers={"If-None-Match": 'W/"something-else"'})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert other.status_code == 200
+
+
+async def test_ingestion_changes_the_etag(client, db):
+    etag = (await client.get("/api/v1/jobs")).headers["etag"]
+
+    await save_to_mongodb([job(50, "2024-06-01")], db)
+    response = await client.get("/api/v1/jobs", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["jobs"][0]["id"] == "job-50"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("identity", "identity"),
+    ("", "identity"),
+])
+async def test_compressed_page_follows_accept_encoding(client, db, accept, expected):
+    await db["jobs"].insert_many([job(n, "2024-04-01") for n in range(20, 40)])
+
+    response = await client.get("/api/v1/jobs", headers={"Accept-Encoding": accept})
+
+    assert response.headers.get("content-encoding", "identity") == expected
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["jobs"]) == 27
+
+
+def test_small_pages_are_not_compressed():
+    page = CachedPage(b'{"jobs":[],"next_cursor":null}')
+
+    assert choose_encoding("gzip, br", page.bodies) == "identity"
+
+
+def test_cached_page_holds_each_encoding():
+    body = b'{"jobs":[' + b",".join([b'{"id":"job"}'] * 200) + b'],"next_cursor":null}'
+    page = CachedPage(body)
+
+    assert gzip.decompress(page.bodies["gzip"]) == body
+    assert page.etag.startswith('W/"')
+
+
+def test_etag_comparison_is_weak():
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
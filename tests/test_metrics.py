@@ -0,0 +1,17 @@
+import httpx
+import pytest
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_request_latency_is_labelled_with_the_full_route_template(db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/v1/resume/jobs/not-a-job")).status_code == 404
+        assert (await client.get("/api/v1/health/live")).status_code == 200
+        assert (await client.get("/no/such/path")).status_code == 404
+        scrape = (await client.get("/metrics")).text
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/resume/jobs/{job_id}",status="404"} 1' in scrape
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/health/live",status="200"} 1' in scrape
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in scrape
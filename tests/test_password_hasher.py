@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import httpx
+import pytest
+from app.api.v1 import users
+from app.main import app
+from app.services.password_hasher import HashPoolFull, PasswordHasher
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingContext:
+    """Stands in for the bcrypt context: records call order, and the first call waits for `gate`."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def hash(self, password):
+        self.calls.append(password)
+        if len(self.calls) == 1:
+            self.gate.wait(5)
+        return f"hashed:{password}"
+
+    def verify_and_update(self, password, hashed):
+        self.calls.append(password)
+        return hashed == f"hashed:{password}", None
+
+
+@pytest.fixture
+def context():
+    context = RecordingContext()
+    yield context
+    context.gate.set()
+
+
+def make_hasher(context, max_queued=(10, 10)) -> PasswordHasher:
+    return PasswordHasher(workers=1, max_queued=max_queued, context=context)
+
+
+async def until_queued(hasher: PasswordHasher, count: int):
+    while len(hasher.waiting) < count:
+        await asyncio.sleep(0)
+
+
+async def test_waiting_logins_run_before_waiting_signups(context):
+    hasher = make_hasher(context)
+    busy = asyncio.create_task(hasher.hash("busy"))
+    await asyncio.sleep(0)
+    signup = asyncio.create_task(hasher.hash("signup"))
+    await until_queued(hasher, 1)
+    login = asyncio.create_task(hasher.verify_and_update("login", "hashed:login"))
+    await until_queued(hasher, 2)
+
+    context.gate.set()
+    await asyncio.gather(busy, signup, login)
+
+    assert context.calls == ["busy", "login", "signup"]
+    assert login.result() == (True, None)
+    hasher.shutdown()
+
+
+async def test_each_priority_has_its_own_queue_limit(context):
+    hasher = make_hasher(context, max_queued=(1, 1))
+    busy = asyncio.create_task(hasher.hash("busy"))
+    await asyncio.sleep(0)
+    queued_signup = asyncio.create_task(hasher.hash("signup"))
+    await until_queued(hasher, 1)
+
+    with pytest.raises(HashPoolFull) as full:
+        await hasher.hash("one too many")
+    assert full.value.retry_after >= 1
+    # logins are still accepted while signups are full
+    queued_login = asyncio.create_task(hasher.verify_and_update("login", "hashed:login"))
+    await until_queued(hasher, 2)
+
+    context.gate.set()
+    await asyncio.gather(busy, queued_signup, queued_login)
+    assert "one too many" not in context.calls
+    assert hasher.queued == [0, 0] and hasher.running == 0
+    hasher.shutdown()
+
+
+class FullHasher:
+    async def hash(self, password):
+        raise HashPoolFull(retry_after=7)
+
+    async def verify_and_update(self, password, hashed):
+        raise HashPoolFull(retry_after=3)
+
+
+async def test_full_pool_answers_429_with_retry_after(db, monkeypatch):
+    monkeypatch.setattr(users, "password_hasher", FullHasher())
+    await db["users"].insert_one({"name": "Ann", "email": "ann@example.com", "password": "hash"})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        signup = await client.post("/api/v1/signup", json={"name": "Bo", "email": "bo@example.com", "password": "pw"})
+        login = await client.post("/api/v1/login", json={"email": "ann@example.com", "password": "pw"})
+
+    assert signup.status_code == 429
+    assert signup.headers["retry-after"] == "7"
+    assert login.status_code == 429
+    assert login.headers["retry-after"] == "3"
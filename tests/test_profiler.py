@@ -0,0 +1,40 @@
+import time
+from collections import Counter
+from app.utils import profiler
+
+
+def busy(seconds: float) -> str:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+
+def test_profile_call_samples_the_calling_thread():
+    result, counts = profiler.profile_call(0.001, busy, 0.1)
+
+    assert result == "done"
+    assert sum(counts.values()) > 10
+    in_busy = sum(count for stack, count in counts.items() if any(frame.startswith("busy (") for frame in stack))
+    # a sample or two may land in profile_call just before or after the call
+    assert in_busy >= sum(counts.values()) - 2
+
+
+def test_profile_call_runs_inside_an_active_profile():
+    sampler = profiler.ProcessSampler(0.001)
+    sampler.start()
+    try:
+        result, counts = profiler.profile_call(0.001, busy, 0.05)
+    finally:
+        sampler.stop()
+
+    assert result == "done" and counts
+
+
+def test_included_stacks_are_merged_under_their_prefix():
+    sampler = profiler.ProcessSampler(0.001)
+    sampler.start()
+    sampler.include(Counter({("main", "extract"): 3}), ("pdf-extraction",))
+    profile = sampler.stop()
+
+    assert "pdf-extraction;main;extract 3\n" in profile
@@ -0,0 +1,35 @@
+from app.services.prompt_compaction import compact_pages, cut, estimate_tokens, truncate
+
+SENTENCE = "Built and operated Python services for payments at scale. "
+
+
+def test_one_line_page_is_cut_to_the_budget():
+    page = "Jane Doe jane@example.com " + SENTENCE * 3200
+
+    compacted = compact_pages([page], token_budget=3000)
+
+    assert compacted.original_tokens > 45000
+    assert compacted.tokens <= 3000
+    assert compacted.text.startswith("Jane Doe jane@example.com")
+    # cut at a sentence boundary, not mid-word
+    assert compacted.text.endswith("at scale.")
+
+
+def test_long_lines_in_several_sections_stay_within_the_budget():
+    pages = ["Jane Doe\nSkills\n" + "python sql " * 4000 + "\nExperience\n" + SENTENCE * 800]
+
+    compacted = compact_pages(pages, token_budget=500)
+
+    assert compacted.tokens <= 500
+    assert "Skills" in compacted.text and "Experience" in compacted.text
+
+
+def test_truncate_keeps_whole_lines_that_fit():
+    lines = ["Skills", "python, sql", "x" * 400]
+
+    assert truncate(lines, 10) == ["Skills", "python, sql", "x" * 8]
+
+
+def test_cut_falls_back_to_characters_without_boundaries():
+    assert cut("y" * 100, 5) == "y" * 20
+    assert estimate_tokens(cut(SENTENCE * 10, 40)) <= 40
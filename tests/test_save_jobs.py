@@ -0,0 +1,56 @@
+from datetime import datetime
+import pytest
+from app.services.catalog_version import catalog_version
+from app.services.jobs import save_to_mongodb
+
+pytestmark = pytest.mark.anyio
+
+
+def job(n: int, title: str = "Backend Engineer") -> dict:
+    return {
+        "id": f"job-{n}", "title": f"{title} {n}", "company": "Acme", "url": f"https://example.com/{n}",
+        "date": "2024-05-01", "source": "Remote OK",
+    }
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_version():
+    catalog_version.value = None
+    yield
+    catalog_version.value = None
+
+
+async def test_first_save_inserts_every_job(db):
+    stats = await save_to_mongodb([job(n) for n in range(5)], db, batch_size=2)
+
+    assert stats == {"inserted": 5, "updated": 0, "unchanged": 0, "failed": 0}
+    assert await db["jobs"].count_documents({"content_hash": {"$exists": True}}) == 5
+    assert await catalog_version.current(db) == 1
+
+
+async def test_saving_the_same_jobs_again_writes_nothing(db):
+    await save_to_mongodb([job(n) for n in range(5)], db, batch_size=2)
+    saved_at = datetime(2024, 1, 1)
+    await db["jobs"].update_many({}, {"$set": {"updated_at": saved_at}})
+
+    stats = await save_to_mongodb([job(n) for n in range(5)], db, batch_size=2)
+
+    assert stats == {"inserted": 0, "updated": 0, "unchanged": 5, "failed": 0}
+    assert await db["jobs"].count_documents({"updated_at": saved_at}) == 5
+    # nothing changed, so cached /jobs pages stay valid
+    assert await catalog_version.current(db) == 1
+
+
+async def test_changed_and_new_jobs_are_counted_separately(db):
+    await save_to_mongodb([job(n) for n in range(3)], db)
+    saved_at = datetime(2024, 1, 1)
+    await db["jobs"].update_many({}, {"$set": {"updated_at": saved_at}})
+
+    stats = await save_to_mongodb([job(0), job(1, title="Staff Engineer"), job(2), job(3)], db, batch_size=2)
+
+    assert stats == {"inserted": 1, "updated": 1, "unchanged": 2, "failed": 0}
+    after = {doc["id"]: doc for doc in await db["jobs"].find().to_list(None)}
+    assert after["job-1"]["title"] == "Staff Engineer 1"
+    assert after["job-1"]["updated_at"] > saved_at
+    assert after["job-0"]["updated_at"] == saved_at
+    assert await catalog_version.current(db) == 2